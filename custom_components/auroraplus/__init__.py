@@ -2,44 +2,107 @@
 
 import logging
 
+import aiohttp
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import (
-    ConfigEntryNotReady,
     PlatformNotReady,
 )
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
 
-from .api import aurora_init
-from .const import CONF_TOKEN
+from .api import (
+    AuroraPlusAsyncApi,
+    async_aurora_init,
+    async_get_session,
+    async_take_api,
+)
+from .const import CONF_SERVICE_AGREEMENT_ID, CONF_TOKEN, DOMAIN, REPAIR_INTERVAL
 from .coordinator import AuroraPlusCoordinator
+from .services import async_setup_services
+from .store import AuroraPlusUsageStore
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration's services, for all entries."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up entry."""
     token = entry.data.get(CONF_TOKEN)
 
-    try:
-        api = await hass.async_add_executor_job(aurora_init, token)
-    except OSError as err:
-        raise PlatformNotReady("Connection to Aurora+ failed") from err
+    service_agreement_id = entry.data.get(CONF_SERVICE_AGREEMENT_ID)
+    usage_store = AuroraPlusUsageStore(hass, service_agreement_id)
+    await usage_store.async_load()
+
+    # Right after the config flow, carry on with the API it validated.
+    api = async_take_api(hass, service_agreement_id, token)
 
-    entry.runtime_data = AuroraPlusCoordinator(hass, entry, api)
+    account = usage_store.account
+    if api is None and account.get("customerId"):
+        # We've seen this service before: set up from what we saved, and only
+        # talk to Aurora+ in the background.
+        _LOGGER.debug(f"setting up from saved account information {account=}")
+        api = AuroraPlusAsyncApi.from_account(
+            async_get_session(hass), token.copy(), account
+        )
+        entry.runtime_data = AuroraPlusCoordinator(hass, entry, api, usage_store)
 
-    if not (
-        hasattr(entry.runtime_data, "week")
-        and entry.runtime_data.week.get("TariffTypes")
-    ):
-        raise ConfigEntryNotReady("No tariffs in returned data, yet")
+        await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+
+        entry.async_create_background_task(
+            hass,
+            entry.runtime_data.async_background_refresh(),
+            f"{entry.title} background refresh",
+        )
+        _async_start_background_work(hass, entry)
+        return True
+
+    if api is None:
+        try:
+            api = await async_aurora_init(hass, token)
+        except (OSError, aiohttp.ClientError) as err:
+            raise PlatformNotReady("Connection to Aurora+ failed") from err
+
+    entry.runtime_data = AuroraPlusCoordinator(hass, entry, api, usage_store)
+
+    await entry.runtime_data.async_config_entry_first_refresh()
+    await entry.runtime_data.async_save_account()
 
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+    _async_start_background_work(hass, entry)
 
     return True
 
 
+def _async_start_background_work(hass: HomeAssistant, entry: ConfigEntry):
+    entry.runtime_data.async_start_token_refresh()
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            entry.runtime_data.repair.async_check,
+            REPAIR_INTERVAL,
+            name=f"{entry.title} statistics check",
+        )
+    )
+    entry.async_create_background_task(
+        hass,
+        entry.runtime_data.backfill.async_resume(),
+        f"{entry.title} backfill",
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    await AuroraPlusCoordinator.update_config_entry_token(hass, entry)
-    return True
+    await AuroraPlusCoordinator.update_config_entry_token(hass, entry, flush=True)
+    await entry.runtime_data.usage_store.async_flush()
+    return await hass.config_entries.async_unload_platforms(entry, ["sensor"])
@@ -0,0 +1,112 @@
+"""Running usage totals over the week, month and billing period."""
+
+import datetime
+import logging
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+from .const import PERIOD_BILLING, PERIOD_MONTH, PERIOD_WEEK, PERIODS, USAGE_FIELDS
+
+_LOGGER = logging.getLogger(__name__)
+
+PeriodTotals = Mapping[str, Mapping[str, Mapping[str, float]]]
+PeriodStarts = Mapping[str, datetime.date | None]
+
+
+def period_start(period: str, date: datetime.date, billing_day: int) -> datetime.date:
+    """Return the first day of the period a date falls in.
+
+    Weeks start on Mondays, and billing periods on billing_day of the month.
+    """
+    if period == PERIOD_WEEK:
+        return date - datetime.timedelta(days=date.weekday())
+    if period == PERIOD_MONTH:
+        return date.replace(day=1)
+    if period == PERIOD_BILLING:
+        if date.day >= billing_day:
+            return date.replace(day=billing_day)
+        previous = date.replace(day=1) - datetime.timedelta(days=1)
+        return previous.replace(day=billing_day)
+    raise ValueError(f"unknown period {period}")
+
+
+class UsageAggregates:
+    """Usage totals since the start of each period, per field and tariff.
+
+    The periods are those of the latest day with data, as Aurora+ lags by a day
+    or two. Days are added as they are stored, from their daily totals, so
+    each costs the same whatever the length of the period. A day added again
+    replaces what it added before. When a day from a later period comes in,
+    that period starts over.
+
+    Nothing is saved: the totals are rebuilt from the usage store on start.
+    """
+
+    _billing_day: int
+    _starts: dict[str, datetime.date | None]
+    _totals: dict[str, dict[str, dict[str, float]]]
+    _days: dict[datetime.date, dict[str, dict[str, float]]]
+    _snapshot: tuple[PeriodTotals, PeriodStarts] | None
+
+    def __init__(self, billing_day: int):
+        self._billing_day = billing_day
+        self._starts = dict.fromkeys(PERIODS)
+        self._totals = {period: {} for period in PERIODS}
+        self._days = {}
+        self._snapshot = None
+
+    def add_days(self, days: dict[datetime.date, dict[str, Any]]):
+        """Count stored days (as normalised) in the periods they fall in."""
+        for date in sorted(days):
+            self._add_day(date, days[date].get("totals") or {})
+        self._snapshot = None
+
+    def _add_day(self, date: datetime.date, totals: dict[str, dict[str, float]]):
+        for period in PERIODS:
+            start = period_start(period, date, self._billing_day)
+            if self._starts[period] is None or start > self._starts[period]:
+                self._starts[period] = start
+                self._totals[period] = {}
+                _LOGGER.debug(f"{period} totals start over on {start}")
+
+        previous = self._days.get(date)
+        self._days[date] = totals
+        for period in PERIODS:
+            if date < self._starts[period]:
+                continue
+            if previous is not None:
+                self._count(period, previous, -1)
+            self._count(period, totals, 1)
+
+        # Only the days of the current periods can be replaced.
+        oldest = min(self._starts.values())
+        for d in [d for d in self._days if d < oldest]:
+            del self._days[d]
+
+    def _count(self, period: str, totals: dict[str, dict[str, float]], sign: int):
+        for field in USAGE_FIELDS:
+            field_totals = self._totals[period].setdefault(field, {"Total": 0.0})
+            for tariff, value in (totals.get(field) or {}).items():
+                field_totals[tariff] = field_totals.get(tariff, 0.0) + sign * value
+
+    def snapshot(self) -> tuple[PeriodTotals, PeriodStarts]:
+        """Return read-only copies of the totals and the start of each period.
+
+        The same copies are returned until more days are added.
+        """
+        if self._snapshot is None:
+            totals = {
+                period: MappingProxyType(
+                    {
+                        field: MappingProxyType(dict(tariffs))
+                        for field, tariffs in fields.items()
+                    }
+                )
+                for period, fields in self._totals.items()
+            }
+            self._snapshot = (
+                MappingProxyType(totals),
+                MappingProxyType(dict(self._starts)),
+            )
+        return self._snapshot
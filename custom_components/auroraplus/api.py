@@ -1,16 +1,33 @@
+import asyncio
+import inspect
 import logging
+from collections.abc import Callable
 from typing import Any
 
+import aiohttp
 from auroraplus import AuroraPlusApi, AuroraPlusAuthenticationError
 from requests.exceptions import HTTPError
 
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import (
     ConfigEntryAuthFailed,
 )
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.util.hass_dict import HassKey
 
+from .const import DOMAIN
+from .limiter import async_get_limiter
 
 _LOGGER = logging.getLogger(__name__)
 
+API_URL = "https://api.auroraenergy.com.au/api"
+API_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+DATA_SESSION: HassKey[aiohttp.ClientSession] = HassKey(f"{DOMAIN}_session")
+DATA_HANDOFF: HassKey[dict[str, "AuroraPlusAsyncApi | AuroraPlusApi"]] = HassKey(
+    f"{DOMAIN}_handoff"
+)
+
 
 def aurora_init(
     token: dict[str, Any] = {},
@@ -24,11 +41,11 @@ def aurora_init(
         api = AuroraPlusApi(token=token.copy())
 
         # We need this data in AuroraPlusCoordinator.__init__so we have the
-        # serviceAgreementID, preiseAddress, and tariffs over the previous
-        # week however HomeAssistant is not happy if the calls are made there.
+        # serviceAgreementID and premiseAddress, however HomeAssistant is not
+        # happy if the calls are made there. Tariffs are found in the usage
+        # data as it comes.
 
         api.get_info()
-        api.getweek()
 
     except AuroraPlusAuthenticationError as e:
         raise ConfigEntryAuthFailed("authentication failure on init") from e
@@ -39,3 +56,247 @@ def aurora_init(
         raise e
 
     return api
+
+
+def is_auth_error(e: Exception) -> bool:
+    """Return whether an error from either client is an authentication failure."""
+    if isinstance(e, AuroraPlusAuthenticationError):
+        return True
+    if isinstance(e, HTTPError):
+        return e.response.status_code in [401, 403]
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status in [401, 403]
+    return False
+
+
+async def async_aurora_init(
+    hass: HomeAssistant,
+    token: dict[str, Any] | None = None,
+) -> "AuroraPlusAsyncApi | AuroraPlusApi":
+    """Initialise an API client, as aurora_init does, without blocking.
+
+    The native asyncio client is preferred. If it can't make sense of what the
+    API returns, fall back to the blocking AuroraPlusApi in the executor.
+    """
+    token = dict(token or {})
+    _LOGGER.debug(f"async_aurora_init {token=}")
+    api = AuroraPlusAsyncApi(async_get_session(hass), token=token.copy())
+    try:
+        await async_api_call(hass, api.get_info)
+    except AuroraPlusAuthenticationError as e:
+        raise ConfigEntryAuthFailed("authentication failure on init") from e
+    except (KeyError, IndexError, TypeError, aiohttp.ContentTypeError) as e:
+        _LOGGER.warning(
+            f"unexpected data from the Aurora+ API ({e!r}); "
+            "falling back to the blocking client"
+        )
+        return await hass.async_add_executor_job(aurora_init, token)
+
+    return api
+
+
+async def async_api_call(
+    hass: HomeAssistant, func: Callable[..., Any], *args: Any
+) -> Any:
+    """Call an API operation, from either client, without blocking.
+
+    All calls, from all accounts, go through the shared rate limiter.
+    """
+    async with async_get_limiter(hass):
+        if inspect.iscoroutinefunction(func):
+            return await func(*args)
+        return await hass.async_add_executor_job(func, *args)
+
+
+@callback
+def async_hand_off_api(hass: HomeAssistant, api: "AuroraPlusAsyncApi | AuroraPlusApi"):
+    """Keep an API client the config flow validated, for the entry's setup.
+
+    The client has already fetched the account information, so setting up
+    the entry doesn't have to do it again.
+    """
+    hass.data.setdefault(DATA_HANDOFF, {})[api.serviceAgreementID] = api
+
+
+@callback
+def async_take_api(
+    hass: HomeAssistant, service_agreement_id: str, token: dict[str, Any]
+) -> "AuroraPlusAsyncApi | AuroraPlusApi | None":
+    """Return the API client handed off for a service, once.
+
+    It's only returned if it still holds the token the entry was given.
+    """
+    api = hass.data.get(DATA_HANDOFF, {}).pop(service_agreement_id, None)
+    if api is None or api.token != token:
+        return None
+    return api
+
+
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the HTTP session shared by all Aurora+ accounts.
+
+    Connections are pooled and kept alive across calls. The session doesn't
+    keep cookies, as each account sends its own refresh token.
+    """
+    if DATA_SESSION not in hass.data:
+        hass.data[DATA_SESSION] = async_create_clientsession(
+            hass, cookie_jar=aiohttp.DummyCookieJar()
+        )
+    return hass.data[DATA_SESSION]
+
+
+class AuroraPlusAsyncApi:
+    """Asynchronous client for the Aurora+ API.
+
+    This exposes the same operations and attributes as AuroraPlusApi, so either
+    can back an AuroraPlusCoordinator.
+    """
+
+    token: dict[str, Any]
+    customerId: str
+    serviceAgreementID: str
+    premiseAddress: str
+
+    def __init__(self, session: aiohttp.ClientSession, token: dict[str, Any]):
+        self._session = session
+        self._refresh_lock = asyncio.Lock()
+        self._day_index = None
+        self.token = token
+
+    @classmethod
+    def from_account(
+        cls,
+        session: aiohttp.ClientSession,
+        token: dict[str, Any],
+        account: dict[str, Any],
+    ) -> "AuroraPlusAsyncApi":
+        """Build a client from account information saved earlier.
+
+        This replaces get_info, so the client is usable without any call.
+        """
+        api = cls(session, token)
+        api.customerId = account["customerId"]
+        api.serviceAgreementID = account["serviceAgreementID"]
+        api.premiseAddress = account["premiseAddress"]
+        return api
+
+    async def _request(
+        self, method: str, path: str, *, retry: bool = True, **kwargs: Any
+    ) -> Any:
+        access_token = self.token.get("access_token")
+        async with self._session.request(
+            method,
+            API_URL + path,
+            headers={
+                "Accept": "application/json",
+                "Authorization": f"Bearer {access_token}",
+            },
+            timeout=API_TIMEOUT,
+            **kwargs,
+        ) as response:
+            if response.status not in [401, 403]:
+                response.raise_for_status()
+                return await response.json()
+
+        if not retry:
+            raise AuroraPlusAuthenticationError(f"{method} {path}: {response.status}")
+        await self.refresh_token(access_token)
+        return await self._request(method, path, retry=False, **kwargs)
+
+    async def _get_usage(self, timespan: str, index: int) -> dict[str, Any]:
+        return await self._request(
+            "GET",
+            f"/usage/{timespan}",
+            params={
+                "serviceAgreementID": self.serviceAgreementID,
+                "customerId": self.customerId,
+                "index": index,
+            },
+        )
+
+    async def refresh_token(self, stale_access_token: str | None = None):
+        """Obtain a new access token with the refresh token.
+
+        Concurrent callers that failed with the same stale access token share a
+        single refresh.
+        """
+        async with self._refresh_lock:
+            if (
+                stale_access_token is not None
+                and self.token.get("access_token") != stale_access_token
+            ):
+                return
+
+            async with self._session.post(
+                API_URL + "/identity/refreshToken",
+                cookies={"RefreshToken": self.token.get("cookie_RefreshToken")},
+                timeout=API_TIMEOUT,
+            ) as response:
+                if response.status in [400, 401, 403]:
+                    raise AuroraPlusAuthenticationError(
+                        f"token refresh failed: {response.status}"
+                    )
+                response.raise_for_status()
+                data = await response.json()
+                refresh_cookie = response.cookies.get("RefreshToken")
+
+            token = self.token.copy()
+            token["access_token"] = data["accessToken"].split()[-1]
+            if refresh_cookie is not None:
+                token["cookie_RefreshToken"] = refresh_cookie.value
+            self.token = token
+            _LOGGER.debug("access token refreshed")
+
+    async def get_info(self):
+        current = (await self._request("GET", "/customers/current"))[0]
+        self.customerId = current["CustomerID"]
+        for premise in current["Premises"]:
+            if premise["ServiceAgreementStatus"] == "Active":
+                self.serviceAgreementID = premise["ServiceAgreementID"]
+                self.premiseAddress = premise["Address"]
+                break
+        else:
+            raise KeyError("No active premise found")
+
+    async def getcurrent(self):
+        current = (await self._request("GET", "/customers/current"))[0]
+        for premise in current["Premises"]:
+            if premise["ServiceAgreementID"] == self.serviceAgreementID:
+                break
+        else:
+            raise KeyError(f"ServiceAgreementID {self.serviceAgreementID} not found")
+
+        self.AmountOwed = "{:.2f}".format(premise["AmountOwed"])
+        self.EstimatedBalance = "{:.2f}".format(premise["EstimatedBalance"])
+        self.AverageDailyUsage = "{:.2f}".format(premise["AverageDailyUsage"])
+        self.UsageDaysRemaining = premise["UsageDaysRemaining"]
+        self.ActualBalance = "{:.2f}".format(premise["ActualBalance"])
+        self.UnbilledAmount = "{:.2f}".format(premise["UnbilledAmount"])
+        self.BillTotalAmount = "{:.2f}".format(premise["BillTotalAmount"])
+        self.NumberOfUnpaidBills = premise["NumberOfUnpaidBills"]
+        self.BillOverDueAmount = "{:.2f}".format(premise["BillOverDueAmount"])
+
+    async def getday(self, index: int = -1):
+        self.day = await self._get_usage("day", index)
+        self._day_index = index
+
+    async def fetchday(self, index: int = -1) -> dict[str, Any]:
+        """Return the usage for a day, leaving the current day untouched."""
+        return await self._get_usage("day", index)
+
+    async def getweek(self, index: int = -1):
+        self.week = await self._get_usage("week", index)
+
+    async def fetchweek(self, index: int = -1) -> dict[str, Any]:
+        """Return the usage for a week, leaving the current week untouched."""
+        return await self._get_usage("week", index)
+
+    async def getsummary(self, index: int = -1):
+        # The summary comes from the same endpoint as the day, so reuse the last
+        # day if it's the one asked for.
+        if self._day_index == index:
+            summary = self.day
+        else:
+            summary = await self._get_usage("day", index)
+        self.DollarValueUsage = summary["SummaryTotals"]["DollarValueUsage"]
+        self.KilowattHourUsage = summary["SummaryTotals"]["KilowattHourUsage"]
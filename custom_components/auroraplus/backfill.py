@@ -0,0 +1,208 @@
+"""Backfill of past usage data over a range of dates."""
+
+import asyncio
+import datetime
+import logging
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BACKFILL_CONCURRENCY,
+    BACKFILL_REQUEST_INTERVAL,
+    BACKFILL_SAVE_EVERY,
+    DOMAIN,
+    EVENT_BACKFILL,
+    STORAGE_RETENTION,
+    STORAGE_VERSION,
+)
+from .resilience import API_ERRORS
+from .store import normalise_day
+
+if TYPE_CHECKING:
+    from .coordinator import AuroraPlusCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AuroraPlusBackfill:
+    """Fetch the days missing over a range of dates, and import them.
+
+    Days are fetched by a bounded pool of concurrent requests, no faster than
+    one every BACKFILL_REQUEST_INTERVAL, and go to the usage store as they
+    arrive. The range being backfilled is saved too, so a backfill interrupted
+    by a restart resumes with the days still missing.
+
+    Once all days are in, every registered importer re-imports its statistics,
+    in chronological order, from the start of the range.
+    """
+
+    _hass: HomeAssistant
+    _coordinator: "AuroraPlusCoordinator"
+    _store: Store[dict[str, str]]
+    _importers: list[Callable[[datetime.date], Awaitable[int]]]
+    _listeners: list[Callable[[], None]]
+    _running: bool
+    _next_request: float
+
+    progress: dict[str, Any]
+
+    def __init__(self, hass: HomeAssistant, coordinator: "AuroraPlusCoordinator"):
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}.{coordinator.service_agreement_id}.backfill",
+        )
+        self._importers = []
+        self._listeners = []
+        self._running = False
+        self._next_request = 0.0
+        self._rate_lock = asyncio.Lock()
+        self.progress = {"state": "idle"}
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def percentage(self) -> float | None:
+        """Return the share of the days to fetch done so far."""
+        total = self.progress.get("total")
+        if total is None:
+            return None
+        if not total:
+            return 100.0
+        done = self.progress["fetched"] + self.progress["failed"]
+        return round(100 * done / total, 1)
+
+    @callback
+    def async_add_importer(
+        self, importer: Callable[[datetime.date], Awaitable[int]]
+    ) -> Callable[[], None]:
+        """Register a callable importing statistics from a date on."""
+        self._importers.append(importer)
+        return lambda: self._importers.remove(importer)
+
+    @callback
+    def async_add_listener(
+        self, update_callback: Callable[[], None]
+    ) -> Callable[[], None]:
+        """Register a callback for progress updates."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    async def async_resume(self):
+        """Carry on with a backfill interrupted by a restart, if any."""
+        job = await self._store.async_load()
+        if not job:
+            return
+        _LOGGER.info(f"resuming backfill from {job['start']} to {job['end']}")
+        await self.async_run(
+            datetime.date.fromisoformat(job["start"]),
+            datetime.date.fromisoformat(job["end"]),
+        )
+
+    async def async_run(self, start: datetime.date, end: datetime.date):
+        """Backfill the days from start to end, inclusive."""
+        if self._running:
+            raise RuntimeError("A backfill is already running")
+        self._running = True
+        try:
+            await self._async_run(start, end)
+        finally:
+            self._running = False
+
+    async def _async_run(self, start: datetime.date, end: datetime.date):
+        today = dt_util.now().date()
+        # Older days would be evicted from the store as soon as they're added,
+        # and today's data is never there yet.
+        start = max(start, today - STORAGE_RETENTION + datetime.timedelta(days=1))
+        end = min(end, today - datetime.timedelta(days=1))
+        if start > end:
+            _LOGGER.warning(f"nothing to backfill between {start} and {end}")
+            await self._store.async_remove()
+            return
+
+        await self._store.async_save(
+            {"start": start.isoformat(), "end": end.isoformat()}
+        )
+
+        usage_store = self._coordinator.usage_store
+        missing = [
+            date
+            for i in range((end - start).days + 1)
+            if (date := start + datetime.timedelta(days=i)) not in usage_store
+        ]
+        self._set_progress(
+            state="fetching",
+            start=start.isoformat(),
+            end=end.isoformat(),
+            total=len(missing),
+            fetched=0,
+            failed=0,
+            imported=0,
+        )
+        _LOGGER.info(f"backfilling {len(missing)} days between {start} and {end}")
+
+        semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+        pending: dict[datetime.date, dict[str, Any]] = {}
+
+        async def fetch(date: datetime.date):
+            async with semaphore:
+                await self._async_throttle()
+                try:
+                    day = await self._coordinator.async_fetch_day((date - today).days)
+                except API_ERRORS as e:
+                    _LOGGER.warning(f"could not backfill {date}: {e}")
+                    self._set_progress(failed=self.progress["failed"] + 1)
+                    return
+            if not day.get("NoDataFlag"):
+                pending[date] = normalise_day(day)
+            self._set_progress(fetched=self.progress["fetched"] + 1)
+            if len(pending) >= BACKFILL_SAVE_EVERY:
+                days = dict(pending)
+                pending.clear()
+                await usage_store.async_set_days(days)
+
+        await asyncio.gather(*(fetch(date) for date in missing))
+        if pending:
+            await usage_store.async_set_days(pending)
+
+        self._set_progress(state="importing")
+        imported = await asyncio.gather(
+            *(importer(start) for importer in self._importers)
+        )
+
+        failed = self.progress["failed"]
+        if not failed:
+            await self._store.async_remove()
+        self._set_progress(state="done", imported=sum(imported))
+        self._hass.bus.async_fire(
+            EVENT_BACKFILL,
+            {"service_agreement_id": self._coordinator.service_agreement_id}
+            | self.progress,
+        )
+        _LOGGER.info(
+            f"backfill between {start} and {end} done: "
+            f"{self.progress['fetched']} days fetched, {failed} failed"
+        )
+
+    async def _async_throttle(self):
+        """Wait until the next request is allowed."""
+        loop = asyncio.get_running_loop()
+        async with self._rate_lock:
+            delay = self._next_request - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request = loop.time() + BACKFILL_REQUEST_INTERVAL
+
+    @callback
+    def _set_progress(self, **progress: Any):
+        self.progress = self.progress | progress
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -4,16 +4,26 @@ from typing import Any
 
 import homeassistant.helpers.config_validation as cv
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 
 
 import voluptuous as vol
 
-from .api import aurora_init
+from .api import async_aurora_init, async_hand_off_api
 from .const import (
+    CONF_BATCH_STATISTICS,
+    CONF_BILLING_DAY,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_POLLING_MODE,
+    CONF_SCAN_INTERVAL,
     CONF_SERVICE_AGREEMENT_ID,
     CONF_TOKEN,
+    DEFAULT_BILLING_DAY,
+    DEFAULT_POLLING_MODE,
+    DEFAULT_SCAN_INTERVAL,
     DOMAIN,
+    POLLING_MODES,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -33,6 +43,13 @@ class AuroraPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     MINOR_VERSION = 1
     reauth_entry = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        return AuroraPlusOptionsFlow()
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
         return await self._configure(user_input)
 
@@ -47,17 +64,22 @@ class AuroraPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             token = json.loads(user_input.get(CONF_TOKEN))
             try:
-                api = await self.hass.async_add_executor_job(aurora_init, token)
+                api = await async_aurora_init(self.hass, token)
                 address = api.premiseAddress
                 await self.async_set_unique_id(api.serviceAgreementID)
 
+                # The entry keeps the token as the API left it, which may have
+                # been refreshed, and its setup carries on with this API.
+                data = {
+                    CONF_SERVICE_AGREEMENT_ID: api.serviceAgreementID,
+                    CONF_TOKEN: api.token.copy(),
+                }
+                async_hand_off_api(self.hass, api)
+
                 if self.reauth_entry:
                     self.hass.config_entries.async_update_entry(
                         self.reauth_entry,
-                        data={
-                            CONF_SERVICE_AGREEMENT_ID: api.serviceAgreementID,
-                            CONF_TOKEN: token,
-                        },
+                        data=data,
                     )
                     await self.hass.config_entries.async_reload(
                         self.reauth_entry.entry_id
@@ -67,10 +89,7 @@ class AuroraPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 else:
                     return self.async_create_entry(
                         title=address,
-                        data={
-                            CONF_SERVICE_AGREEMENT_ID: api.serviceAgreementID,
-                            CONF_TOKEN: token,
-                        },
+                        data=data,
                     )
 
             except ConfigEntryAuthFailed:
@@ -100,3 +119,50 @@ class AuroraPlusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         return await self.async_step_user()
+
+
+class AuroraPlusOptionsFlow(config_entries.OptionsFlowWithReload):
+    """AuroraPlus options flow."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_POLLING_MODE,
+                    default=self.config_entry.options.get(
+                        CONF_POLLING_MODE, DEFAULT_POLLING_MODE
+                    ),
+                ): vol.In(POLLING_MODES),
+                vol.Required(
+                    CONF_SCAN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_SCAN_INTERVAL,
+                        int(DEFAULT_SCAN_INTERVAL.total_seconds() // 60),
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Required(
+                    CONF_BATCH_STATISTICS,
+                    default=self.config_entry.options.get(CONF_BATCH_STATISTICS, False),
+                ): cv.boolean,
+                vol.Required(
+                    CONF_BILLING_DAY,
+                    default=self.config_entry.options.get(
+                        CONF_BILLING_DAY, DEFAULT_BILLING_DAY
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=28)),
+                vol.Required(
+                    CONF_COMPACT_ATTRIBUTES,
+                    default=self.config_entry.options.get(
+                        CONF_COMPACT_ATTRIBUTES, False
+                    ),
+                ): cv.boolean,
+            }
+        )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=options_schema,
+        )
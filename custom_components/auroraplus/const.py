@@ -5,12 +5,33 @@ DOMAIN = "auroraplus"
 CONF_TOKEN = "token"
 CONF_SERVICE_AGREEMENT_ID = "service_agreement_id"
 CONF_ROUNDING = "rounding"
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_BATCH_STATISTICS = "batch_statistics"
+CONF_POLLING_MODE = "polling_mode"
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+CONF_BILLING_DAY = "billing_day"
+
+POLLING_MODE_ADAPTIVE = "adaptive"
+POLLING_MODE_FIXED = "fixed"
+POLLING_MODES = [POLLING_MODE_ADAPTIVE, POLLING_MODE_FIXED]
 
 SENSOR_ESTIMATEDBALANCE = "Estimated Balance"
 SENSOR_DOLLARVALUEUSAGE = "Dollar Value Usage"
 SENSOR_KILOWATTHOURUSAGE = "Kilowatt Hour Usage"
 SENSOR_KILOWATTHOURUSAGETARIFF = "Kilowatt Hour Usage Tariff"
 SENSOR_DOLLARVALUEUSAGETARIFF = "Dollar Value Usage Tariff"
+SENSOR_BACKFILLPROGRESS = "Backfill Progress"
+
+# Periods over which usage is totalled, and how their sensors are named.
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+PERIOD_BILLING = "billing_period"
+PERIODS = [PERIOD_WEEK, PERIOD_MONTH, PERIOD_BILLING]
+PERIOD_NAMES = {
+    PERIOD_WEEK: "Week To Date",
+    PERIOD_MONTH: "Month To Date",
+    PERIOD_BILLING: "Billing Period To Date",
+}
 
 SENSORS_MONETARY = [
     SENSOR_ESTIMATEDBALANCE,
@@ -26,3 +47,76 @@ DEFAULT_MONITORED = POSSIBLE_MONITORED
 
 DEFAULT_ROUNDING = 2
 DEFAULT_SCAN_INTERVAL = datetime.timedelta(hours=1)
+DEFAULT_POLLING_MODE = POLLING_MODE_ADAPTIVE
+DEFAULT_BILLING_DAY = 1
+# Adaptive polling: interval within the expected publication window, longest
+# wait otherwise, bounds of the margin around the expected time, and number of
+# publication times remembered.
+ADAPTIVE_DENSE_INTERVAL = datetime.timedelta(minutes=15)
+ADAPTIVE_MAX_INTERVAL = datetime.timedelta(hours=6)
+ADAPTIVE_MIN_MARGIN = datetime.timedelta(hours=1)
+ADAPTIVE_MAX_MARGIN = datetime.timedelta(hours=4)
+ADAPTIVE_MAX_OBSERVATIONS = 14
+# Oldest day to look back to for data, relative to today.
+MIN_DAY_INDEX = -9
+# Missing days from which to catch up with week-sized payloads, and the most
+# days to catch up on that way.
+CATCHUP_MIN_DAYS = 2
+CATCHUP_MAX_DAYS = 28
+
+USAGE_FIELDS = ["DollarValueUsage", "KilowattHourUsage"]
+
+STORAGE_VERSION = 1
+STORAGE_RETENTION = datetime.timedelta(days=400)
+# How long small changes to the usage store wait to be saved with the rest.
+STORAGE_SAVE_DELAY = 300
+
+# How long to wait for statistics from other sensors before importing a batch.
+IMPORT_BATCH_DELAY = 5
+# How many times the recorder tries to write a batch of statistics.
+IMPORT_MAX_ATTEMPTS = 3
+
+SERVICE_BACKFILL = "backfill"
+EVENT_BACKFILL = f"{DOMAIN}_backfill"
+# How often to check the statistics for missing hours, and the most days missing
+# from the usage store to refetch in one check.
+REPAIR_INTERVAL = datetime.timedelta(hours=12)
+REPAIR_MAX_FETCH = 31
+
+SERVICE_EXPORT = "export"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = [EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET]
+# Days fetched at the same time during a backfill, and the minimum time between
+# two requests (seconds).
+BACKFILL_CONCURRENCY = 3
+BACKFILL_REQUEST_INTERVAL = 1.0
+# Days fetched between two saves of the usage store during a backfill.
+BACKFILL_SAVE_EVERY = 10
+
+# Retries of failed calls to Aurora+: attempts per call, and backoff (seconds).
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 2.0
+RETRY_MAX_DELAY = 60.0
+# Failed calls in a row before pausing calls to Aurora+ for an account, and how
+# long to pause for (seconds), at first and at most.
+BREAKER_THRESHOLD = 3
+BREAKER_RESET_TIMEOUT = 300.0
+BREAKER_MAX_RESET_TIMEOUT = 3600.0
+
+# Calls to Aurora+ from all accounts: sustained rate (per second), burst, and
+# most calls in flight at once.
+RATE_LIMIT_RATE = 0.5
+RATE_LIMIT_BURST = 5
+RATE_LIMIT_CONCURRENCY = 4
+# Random delay (seconds) added to each account's refreshes, and to the first
+# one on startup when there are several accounts, to spread them out.
+REFRESH_JITTER = 60.0
+
+# How long before the access token expires to refresh it, and how long to wait
+# (seconds) before trying again when that fails.
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+TOKEN_RETRY_DELAY = 300.0
+# How long to gather rotated tokens before writing them to the config entries
+# (seconds).
+TOKEN_SAVE_DELAY = 60.0
@@ -1,100 +1,511 @@
+import asyncio
+import dataclasses
+import datetime
+import inspect
 import logging
+import random
+from collections.abc import Callable
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
-from auroraplus import AuroraPlusApi, AuroraPlusAuthenticationError
-from requests.exceptions import HTTPError
+from auroraplus import AuroraPlusApi
 
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState
-from homeassistant.exceptions import PlatformNotReady
-from homeassistant.util import Throttle
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .aggregates import UsageAggregates, period_start
+from .api import AuroraPlusAsyncApi, async_api_call, is_auth_error
+from .backfill import AuroraPlusBackfill
+from .importer import LastStatistics
+from .models import AuroraPlusBalance, AuroraPlusData
+from .repair import AuroraPlusStatisticsRepair
+from .resilience import CircuitBreaker, async_call_with_retry
+from .token_manager import AuroraPlusTokenManager, async_get_token_writer
 from .const import (
+    CATCHUP_MAX_DAYS,
+    CATCHUP_MIN_DAYS,
+    CONF_BILLING_DAY,
+    CONF_POLLING_MODE,
+    CONF_SCAN_INTERVAL,
     CONF_TOKEN,
     CONF_SERVICE_AGREEMENT_ID,
+    DEFAULT_BILLING_DAY,
+    DEFAULT_POLLING_MODE,
     DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    MIN_DAY_INDEX,
+    PERIODS,
+    POLLING_MODE_ADAPTIVE,
+    REFRESH_JITTER,
+    USAGE_FIELDS,
 )
+from .schedule import PublishTimeModel
+from .store import AuroraPlusUsageStore, normalise_day, split_days
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class AuroraPlusCoordinator:
-    """Asynchronously-updating wrapper for the AuroraPlus API."""
+class AuroraPlusCoordinator(DataUpdateCoordinator[AuroraPlusData]):
+    """Asynchronously-updating wrapper for the AuroraPlus API.
+
+    A single scheduled fetch runs per update interval, and its result is pushed
+    to all subscribed entities, as an AuroraPlusData snapshot. Callers
+    requesting a refresh while one is already in flight await that same fetch
+    rather than starting another.
+    """
 
     _hass: HomeAssistant
-    _api: AuroraPlusApi
+    _api: AuroraPlusAsyncApi | AuroraPlusApi
     _config_entry: ConfigEntry
+    _update_task: asyncio.Task | None
+    _last_day_date: datetime.date | None
+    _token_lock: asyncio.Lock
+    _day_lock: asyncio.Lock
+    _breaker: CircuitBreaker
+    _token_manager: AuroraPlusTokenManager | None
+    _entry_token: dict[str, Any] | None
+    _usage_store: AuroraPlusUsageStore
+    _aggregates: UsageAggregates
+    _usage_columns_key: tuple[datetime.date | None, datetime.date | None] | None
+    _usage_since: datetime.date | None
+    _publish_model: PublishTimeModel
+    _last_empty_poll: datetime.datetime | None
+    _last_new_data: datetime.datetime | None
 
     service_agreement_id: str
     service_address: str
+    backfill: AuroraPlusBackfill
 
     _instances = {}
 
     def __init__(
-        self, hass: HomeAssistant, config_entry: ConfigEntry, api: AuroraPlusApi
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        api: AuroraPlusAsyncApi | AuroraPlusApi,
+        usage_store: AuroraPlusUsageStore,
     ):
         self._hass = hass
         self._config_entry = config_entry
         self._api = api
+        self._update_task = None
+        self._token_lock = asyncio.Lock()
+        self._day_lock = asyncio.Lock()
+        # The token last seen in the config entry, so one replaced by reauth
+        # isn't overwritten with this API's stale one.
+        self._entry_token = config_entry.data.get(CONF_TOKEN)
         self.service_agreement_id = api.serviceAgreementID
         self.service_address = api.premiseAddress
+        self._breaker = CircuitBreaker(f"{DOMAIN} {self.service_agreement_id}")
+        # Only the asyncio client can refresh its token on its own.
+        self._token_manager = (
+            AuroraPlusTokenManager(hass, api, self._async_token_rotated)
+            if isinstance(api, AuroraPlusAsyncApi)
+            else None
+        )
+        # Days already in the store aren't fetched again.
+        self._usage_store = usage_store
+        self._last_day_date = usage_store.latest_date()
+        self._aggregates = self._load_aggregates(config_entry, usage_store)
+        usage_store.async_add_listener(self._aggregates.add_days)
+        self._usage_since = self._last_day_date
+        self._usage_columns_key = None
+        self._publish_model = PublishTimeModel(usage_store.publish_times)
+        self._last_empty_poll = None
+        self._last_new_data = self._publish_model.last_seen()
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=config_entry,
+            name=f"{DOMAIN} {self.service_agreement_id}",
+            update_interval=self.get_scan_interval(config_entry),
+            # Unchanged snapshots aren't pushed to entities.
+            always_update=False,
+        )
+        # Entities show what was saved until the first refresh.
+        self.data = self._build_data()
+        self.backfill = AuroraPlusBackfill(hass, self)
+        self.repair = AuroraPlusStatisticsRepair(hass, self)
+        # The latest statistic of each tariff, so writing more needn't read it.
+        self.last_statistics = LastStatistics(hass)
         self.__class__._instances[self.service_agreement_id] = self
         _LOGGER.debug(f"AuroraPlusCoordinator ready with {self._api}")
 
-    @Throttle(min_time=DEFAULT_SCAN_INTERVAL)  # XXX: should be configurable
-    async def async_update(self):
-        _LOGGER.debug("running async_update ...")
-        try:
-            _LOGGER.debug(f"... {self._throttle=}")
-        except:  # noqa: E722
-            _LOGGER.debug("... no throttle")
+    @staticmethod
+    def get_scan_interval(config_entry: ConfigEntry) -> datetime.timedelta:
+        """Return the update interval configured for this entry."""
+        minutes = config_entry.options.get(CONF_SCAN_INTERVAL)
+        if not minutes:
+            return DEFAULT_SCAN_INTERVAL
+        return datetime.timedelta(minutes=minutes)
+
+    @staticmethod
+    def _load_aggregates(
+        config_entry: ConfigEntry, usage_store: AuroraPlusUsageStore
+    ) -> UsageAggregates:
+        """Total the days of the current periods from the store."""
+        billing_day = config_entry.options.get(CONF_BILLING_DAY, DEFAULT_BILLING_DAY)
+        aggregates = UsageAggregates(billing_day)
+        if (latest := usage_store.latest_date()) is not None:
+            oldest = min(period_start(p, latest, billing_day) for p in PERIODS)
+            aggregates.add_days(usage_store.days_since(oldest))
+        return aggregates
+
+    @property
+    def adaptive_polling(self) -> bool:
+        return (
+            self._config_entry.options.get(CONF_POLLING_MODE, DEFAULT_POLLING_MODE)
+            == POLLING_MODE_ADAPTIVE
+        )
+
+    def _build_data(self) -> AuroraPlusData:
+        """Take a snapshot of the latest data, for entities.
+
+        The new days are only split into columns when they changed: these are
+        all the days added by the last refresh that found data, the latest day
+        or every day caught up on after an outage. If nothing changed at all,
+        the previous snapshot is returned, and entities aren't updated.
+        """
+        balance = AuroraPlusBalance.from_api(self._api)
+        tariffs = tuple(self.tariffs)
+        period_totals, period_starts = self._aggregates.snapshot()
+        key = (self._usage_since, self._last_day_date)
+        previous = self.data
+        if previous is not None and self._usage_columns_key == key:
+            if (
+                previous.balance == balance
+                and previous.tariffs == tariffs
+                and previous.period_totals is period_totals
+            ):
+                _LOGGER.debug("data unchanged since the last refresh")
+                return previous
+            return dataclasses.replace(
+                previous,
+                balance=balance,
+                tariffs=tariffs,
+                period_totals=period_totals,
+                period_starts=period_starts,
+            )
+
+        day = (
+            self._usage_store.get_day(self._last_day_date)
+            if self._last_day_date is not None
+            else None
+        )
+        self._usage_columns_key = key
+        return AuroraPlusData.build(
+            balance=balance,
+            usage_date=self._last_day_date,
+            totals=(day or {}).get("totals", {}),
+            tariffs=self.tariffs,
+            usage=(
+                self._usage_store.usage_columns_since(self._usage_since)
+                if self._usage_since is not None
+                else {}
+            ),
+            period_totals=period_totals,
+            period_starts=period_starts,
+        )
+
+    @property
+    def usage_store(self) -> AuroraPlusUsageStore:
+        return self._usage_store
+
+    @property
+    def tariffs(self) -> list[str]:
+        """Return the tariffs seen in the usage data so far."""
+        return self._usage_store.tariffs
+
+    async def async_save_account(self):
+        """Save what's needed to set up the service again without any call."""
+        await self._usage_store.async_set_account(
+            {
+                "customerId": getattr(self._api, "customerId", None),
+                "serviceAgreementID": self._api.serviceAgreementID,
+                "premiseAddress": self._api.premiseAddress,
+                "TariffTypes": self.tariffs,
+            }
+        )
+
+    @callback
+    def async_start_token_refresh(self):
+        """Refresh the access token ahead of its expiry, until unloaded."""
+        if self._token_manager is None:
+            return
+        self._token_manager.async_start()
+        self._config_entry.async_on_unload(self._token_manager.async_stop)
+
+    async def _async_token_rotated(self):
+        await self.update_config_entry_token(self._hass, self._config_entry)
+
+    async def async_background_refresh(self):
+        """Refresh data, when the service was set up from saved information.
+
+        With several accounts, their first refreshes are spread out.
+        """
+        if len(self._instances) > 1:
+            await asyncio.sleep(random.uniform(0, REFRESH_JITTER))
+        await self.async_refresh()
+
+    async def _async_update_data(self) -> AuroraPlusData:
+        """Run one fetch, or join the one already in flight."""
+        if self._update_task is None:
+            self._update_task = self._hass.async_create_task(
+                self._api_update(), f"{self.name} update", eager_start=False
+            )
+            self._update_task.add_done_callback(self._async_update_task_done)
+        return await asyncio.shield(self._update_task)
+
+    @callback
+    def _async_update_task_done(self, _task: asyncio.Task) -> None:
+        self._update_task = None
+
+    async def _api_update(self) -> AuroraPlusData:
+        _LOGGER.debug("running _api_update ...")
         try:
-            await self._api_update()
-        except PlatformNotReady as exc:
-            _LOGGER.warning("AuroraPlusCoordinator not ready for data update yet")
-            _LOGGER.exception(exc)
+            if self._breaker.state == CircuitBreaker.CLOSED:
+                # getcurrent doesn't depend on which day has data, so it runs
+                # alongside the day probes, which must stay in sequence.
+                results = await asyncio.gather(
+                    self._api_call(self._api.getcurrent),
+                    self._fetch_day(),
+                    return_exceptions=True,
+                )
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+            else:
+                # Only one call at a time can probe whether Aurora+ is back.
+                await self._api_call(self._api.getcurrent)
+                await self._fetch_day()
+            return self._build_data()
+        except Exception as e:
+            if is_auth_error(e):
+                raise ConfigEntryAuthFailed("authentication failure on update") from e
+            raise UpdateFailed(f"error fetching data: {e}") from e
+        finally:
+            await self.update_config_entry_token(self._hass, self._config_entry)
+
+    async def _api_call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run an API call without blocking.
 
-    async def _api_update(self):
+        Transient failures are retried with backoff, and calls stop for a while
+        if Aurora+ keeps failing (see async_call_with_retry).
+
+        Calls run concurrently and share the API's token. If one of them fails
+        authentication after another has rotated the token under it, retry it
+        once, alone, with the new token.
+        """
+        token = dict(self._api.token)
         try:
-            await self._hass.async_add_executor_job(self._api.getcurrent)
+            return await async_call_with_retry(
+                lambda: async_api_call(self._hass, func, *args),
+                self._breaker,
+                name=func,
+            )
+        except Exception as e:
+            if not is_auth_error(e) or self._api.token == token:
+                raise
+            _LOGGER.debug(f"token rotated during {func}; retrying")
+            async with self._token_lock:
+                return await async_api_call(self._hass, func, *args)
+
+    async def async_fetch_day(self, index: int) -> dict[str, Any]:
+        """Return the usage for any day, without changing the latest day.
 
-            for i in range(-1, -10, -1):
-                await self._hass.async_add_executor_job(self._api.getday, i)
+        The blocking client only keeps one day, so this waits for any update in
+        progress, and puts its day back afterwards.
+        """
+        if inspect.iscoroutinefunction(getattr(self._api, "fetchday", None)):
+            return await self._api_call(self._api.fetchday, index)
+        async with self._day_lock:
+            day = getattr(self._api, "day", None)
+            try:
+                await self._api_call(self._api.getday, index)
+                return self._api.day
+            finally:
+                if day is not None:
+                    self._api.day = day
+
+    async def _fetch_day(self):
+        async with self._day_lock:
+            previous = self._last_day_date
+            await self._catch_up()
+            await self._fetch_latest_day()
+            if self._last_day_date != previous:
+                self._usage_since = (
+                    previous + datetime.timedelta(days=1)
+                    if previous is not None
+                    else self._last_day_date
+                )
+            await self._learn_schedule(self._last_day_date != previous)
+
+    async def _learn_schedule(self, new_data: bool):
+        """Record when new data showed up, and pick the next update interval.
+
+        A publication time is only recorded when it's bracketed by a poll that
+        found nothing new, so data published while we weren't looking (before
+        setup, or during an outage) doesn't skew the model. The midpoint
+        between the two polls is used.
+        """
+        now = dt_util.now()
+        if not new_data:
+            self._last_empty_poll = now
+        else:
+            if self._last_empty_poll is not None:
+                self._publish_model.record(
+                    self._last_empty_poll + (now - self._last_empty_poll) / 2
+                )
+                await self._usage_store.async_set_publish_times(
+                    self._publish_model.observations
+                )
+            self._last_empty_poll = None
+            self._last_new_data = now
+
+        interval = self.get_scan_interval(self._config_entry)
+        if self.adaptive_polling:
+            interval = self._publish_model.next_update_interval(
+                now, interval, self._last_new_data
+            )
+        # Accounts polling on the same schedule don't all go at once.
+        self.update_interval = interval + datetime.timedelta(
+            seconds=random.uniform(0, REFRESH_JITTER)
+        )
+        _LOGGER.debug(f"next update in {self.update_interval}")
+
+    async def _fetch_week(self, index: int) -> dict[str, Any]:
+        if inspect.iscoroutinefunction(getattr(self._api, "fetchweek", None)):
+            return await self._api_call(self._api.fetchweek, index)
+        await self._api_call(self._api.getweek, index)
+        return self._api.week
+
+    async def _catch_up(self):
+        """Fetch the days missed since the last one with data, a week at a time.
+
+        This only kicks in when at least CATCHUP_MIN_DAYS are missing, and at
+        most CATCHUP_MAX_DAYS. Week payloads are split into days, and walked
+        back from the latest until they reach the first missing day. Any day
+        not covered is left for _fetch_latest_day to probe.
+        """
+        if self._last_day_date is None:
+            return
+        today = dt_util.now().date()
+        since = self._last_day_date + datetime.timedelta(days=1)
+        missing = (today - since).days
+        if not CATCHUP_MIN_DAYS <= missing <= CATCHUP_MAX_DAYS:
+            return
+
+        days = {}
+        for index in range(-1, -2 - CATCHUP_MAX_DAYS // 7, -1):
+            week = split_days(await self._fetch_week(index))
+            days |= {d: day for d, day in week.items() if since <= d < today}
+            if not week or min(week) <= since:
+                break
+        if not days:
+            _LOGGER.debug(f"No data in week payloads since {since}")
+            return
+
+        await self._usage_store.async_set_days(days)
+        self._last_day_date = max(days)
+        _LOGGER.info(
+            f"Caught up on {len(days)} of {missing} missing days, "
+            f"up to {self._last_day_date}"
+        )
+
+    async def _fetch_latest_day(self):
+        """Fetch the most recent day with data.
+
+        On a cold start, walk back from yesterday until a day has data. After
+        that, remember the date that had data, and only probe the days after
+        it, stopping at the first one without data. Days already in the store
+        are never fetched again, and those probed on the way to the latest
+        one are stored along with it.
+        """
+        today = dt_util.now().date()
+        if self._last_day_date is None:
+            last_index = None
+        else:
+            last_index = (self._last_day_date - today).days
+            if last_index < MIN_DAY_INDEX:
+                _LOGGER.debug(f"Last data on {self._last_day_date} too old")
+                last_index = None
+
+        probed = {}
+        if last_index is None:
+            for i in range(-1, MIN_DAY_INDEX - 1, -1):
+                await self._api_call(self._api.getday, i)
                 if not self._api.day["NoDataFlag"]:
-                    await self._hass.async_add_executor_job(self._api.getsummary, i)
                     break
                 _LOGGER.debug(f"No data at index {i}")
-            _LOGGER.info(
-                "Successfully obtained data from " + self._api.day["StartDate"]
-            )
-        except AuroraPlusAuthenticationError as e:
-            _LOGGER.exception(f"authentication failure on update: {e}")
-            self._config_entry.async_start_reauth(self._hass)
-        except HTTPError as e:
-            status_code = e.response.status_code
-            if status_code in [401, 403]:
-                _LOGGER.exception(f"authentication failure on update: {e}")
-                self._config_entry.async_start_reauth(self._hass)
-            raise e
-        except Exception as e:
-            _LOGGER.exception(f"authentication failure on update: {e}")
+            else:
+                _LOGGER.warning(f"No data in the last {-MIN_DAY_INDEX} days")
+                return
+        else:
+            day = None
+            for j in range(last_index + 1, 0):
+                await self._api_call(self._api.getday, j)
+                if self._api.day["NoDataFlag"]:
+                    _LOGGER.debug(f"No new data at index {j}")
+                    break
+                if day is not None and day.get("MeteredUsageRecords"):
+                    probed[today + datetime.timedelta(days=i)] = normalise_day(day)
+                day = self._api.day
+                i = j
+            if day is None:
+                _LOGGER.debug(f"No data newer than {self._last_day_date}")
+                return
+            # A failed probe overwrites the last day that had data.
+            self._api.day = day
 
-        await self.update_config_entry_token(self._hass, self._config_entry)
+        await self._api_call(self._api.getsummary, i)
+        self._last_day_date = today + datetime.timedelta(days=i)
+        totals = {field: getattr(self._api, field, {}) for field in USAGE_FIELDS}
+        await self._usage_store.async_set_days(
+            probed | {self._last_day_date: normalise_day(self._api.day, totals)}
+        )
+        _LOGGER.info("Successfully obtained data from " + self._api.day["StartDate"])
 
     @classmethod
     async def update_config_entry_token(
-        cls, hass: HomeAssistant, config_entry: ConfigEntry
+        cls, hass: HomeAssistant, config_entry: ConfigEntry, *, flush: bool = False
     ):
+        """Queue writing the API's token to the config entry.
+
+        Writes for all entries are gathered, and made together, by the token
+        writer. With flush, this entry's is made now.
+        """
+        writer = async_get_token_writer(hass)
+        writer.async_schedule(
+            config_entry.entry_id,
+            lambda: cls._write_config_entry_token(hass, config_entry),
+        )
+        if flush:
+            writer.async_flush(config_entry.entry_id)
+
+    @classmethod
+    @callback
+    def _write_config_entry_token(cls, hass: HomeAssistant, config_entry: ConfigEntry):
         service_agreement_id = config_entry.data.get(CONF_SERVICE_AGREEMENT_ID)
-        if config_entry.state != ConfigEntryState.LOADED:
+        if config_entry.state not in [
+            ConfigEntryState.LOADED,
+            ConfigEntryState.UNLOAD_IN_PROGRESS,
+        ]:
             _LOGGER.debug(
                 f"update_config_entry_token for {service_agreement_id} not ready yet; skipping token update "
             )
             return
 
         entry_token = config_entry.data.get(CONF_TOKEN)
-        api_token = cls._instances[service_agreement_id]._api.token
+        coordinator = cls._instances[service_agreement_id]
+        api_token = coordinator._api.token
+        if entry_token != coordinator._entry_token:
+            _LOGGER.debug(
+                f"update_config_entry_token for {service_agreement_id} skipped, the entry has a new token"
+            )
+            return
         if entry_token == api_token:
             _LOGGER.debug(
                 f"update_config_entry_token for {service_agreement_id} with unmodified token {entry_token=} == {api_token=}"
@@ -109,17 +520,5 @@ class AuroraPlusCoordinator:
                 CONF_TOKEN: api_token.copy(),
             },
         )
+        coordinator._entry_token = config_entry.data.get(CONF_TOKEN)
         _LOGGER.debug(f"update_config_entry_token token updated: {updated=}")
-
-    def __getattr__(self, attr: str) -> Any:
-        """Forward any attribute access to the session, or handle error"""
-        if attr == "_throttle":
-            raise AttributeError()
-        # _LOGGER.debug(f"Accessing data for {attr}")
-        try:
-            data = getattr(self._api, attr)
-        except AttributeError:
-            _LOGGER.debug(f"Data for {attr} not yet available")
-            return {}  # empty with a get
-        # _LOGGER.debug(f"... returning {data}")
-        return data
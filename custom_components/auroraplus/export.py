@@ -0,0 +1,118 @@
+"""Export of the cached interval records to CSV or Parquet files."""
+
+import csv
+import datetime
+import logging
+from collections.abc import Iterator
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import EXPORT_FORMAT_CSV, EXPORT_FORMAT_PARQUET, USAGE_FIELDS
+from .store import AuroraPlusUsageStore
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_TIME_COLUMN = "start_time"
+
+Columns = dict[str, list[Any]]
+
+
+def export_columns(tariffs: list[str]) -> list[str]:
+    """Return the names of the columns of an export, in order.
+
+    Each field has one column per tariff, named <field>_<tariff>.
+    """
+    return [EXPORT_TIME_COLUMN] + [
+        f"{field}_{tariff}" for field in USAGE_FIELDS for tariff in tariffs
+    ]
+
+
+def iter_day_columns(
+    store: AuroraPlusUsageStore, dates: list[datetime.date], tariffs: list[str]
+) -> Iterator[Columns]:
+    """Yield the records of each day in turn, as columns.
+
+    Only one day is laid out at a time. Values are as Aurora+ returned them,
+    and None where a record has no value for a tariff. As zero values aren't
+    kept in the store (see normalise_day), None also stands for zero.
+    """
+    names = export_columns(tariffs)
+    for date in dates:
+        if (day := store.get_day(date)) is None or not day.get("records"):
+            continue
+        columns: Columns = {name: [] for name in names}
+        for timestamp, values in day["records"]:
+            columns[EXPORT_TIME_COLUMN].append(
+                dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+            )
+            for field in USAGE_FIELDS:
+                field_values = values.get(field) or {}
+                for tariff in tariffs:
+                    columns[f"{field}_{tariff}"].append(field_values.get(tariff))
+        yield columns
+
+
+def write_csv(path: str, names: list[str], days: Iterator[Columns]) -> int:
+    """Write days of columns to a CSV file, and return the rows written."""
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(names)
+        for columns in days:
+            for row in zip(*(columns[name] for name in names), strict=True):
+                writer.writerow(
+                    [row[0].isoformat(), *("" if v is None else v for v in row[1:])]
+                )
+                rows += 1
+    return rows
+
+
+def write_parquet(path: str, names: list[str], days: Iterator[Columns]) -> int:
+    """Write days of columns to a Parquet file, one row group per day.
+
+    pyarrow is not a requirement of the integration, so this raises
+    ImportError without it.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [pa.field(EXPORT_TIME_COLUMN, pa.timestamp("s", tz="UTC"))]
+        + [pa.field(name, pa.float64()) for name in names[1:]]
+    )
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for columns in days:
+            writer.write_batch(
+                pa.record_batch(
+                    [pa.array(columns[f.name], type=f.type) for f in schema],
+                    schema=schema,
+                )
+            )
+            rows += len(columns[EXPORT_TIME_COLUMN])
+    return rows
+
+
+WRITERS = {
+    EXPORT_FORMAT_CSV: write_csv,
+    EXPORT_FORMAT_PARQUET: write_parquet,
+}
+
+
+def export_usage(
+    store: AuroraPlusUsageStore,
+    dates: list[datetime.date],
+    tariffs: list[str],
+    path: str,
+    export_format: str,
+) -> int:
+    """Write the records of the days given to a file, and return the rows.
+
+    This does blocking I/O, so runs in the executor. The list of dates is
+    taken beforehand, and each day read from the store as it's written.
+    """
+    names = export_columns(tariffs)
+    rows = WRITERS[export_format](path, names, iter_day_columns(store, dates, tariffs))
+    _LOGGER.debug(f"exported {rows} records over {len(dates)} days to {path}")
+    return rows
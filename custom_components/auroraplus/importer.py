@@ -0,0 +1,425 @@
+"""Batched import of historical statistics into the recorder."""
+
+import datetime
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.db_schema import Statistics
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    StatisticsRow,
+    get_last_statistics,
+    import_statistics,
+    split_statistic_id,
+    statistics_during_period,
+    valid_statistic_id,
+)
+from homeassistant.components.recorder.tasks import RecorderTask
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util.hass_dict import HassKey
+from homeassistant_historical_sensor import HistoricalState
+
+from .const import DOMAIN, IMPORT_BATCH_DELAY, IMPORT_MAX_ATTEMPTS, STORAGE_RETENTION
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_IMPORTER: HassKey["AuroraPlusStatisticsImporter"] = HassKey(f"{DOMAIN}_importer")
+
+
+def validate_metadata(metadata: StatisticMetaData) -> None:
+    """Check metadata as async_add_external_statistics would.
+
+    The statistics are written to the recorder directly, in batches, so the
+    checks of its public API are made here instead. Raises ValueError.
+    """
+    statistic_id = metadata["statistic_id"]
+    if not valid_statistic_id(statistic_id):
+        raise ValueError(f"Invalid statistic_id {statistic_id}")
+    domain, _object_id = split_statistic_id(statistic_id)
+    if metadata.get("source") != domain:
+        raise ValueError(f"Invalid source for {statistic_id}")
+    for key in ("mean_type", "unit_class"):
+        if key not in metadata:
+            raise ValueError(f"No {key} for {statistic_id}")
+
+
+def validate_statistics(
+    metadata: StatisticMetaData, statistics: Iterable[StatisticData]
+) -> None:
+    """Check metadata and statistics as async_add_external_statistics would.
+
+    Each statistic must start at the top of an hour, in UTC. Raises ValueError.
+    """
+    validate_metadata(metadata)
+    for statistic in statistics:
+        start = statistic["start"]
+        if start.utcoffset() != datetime.timedelta(0):
+            raise ValueError(f"Statistic for {metadata['statistic_id']} not in UTC")
+        if start.minute or start.second or start.microsecond:
+            raise ValueError(
+                f"Statistic for {metadata['statistic_id']} not on the hour: {start}"
+            )
+
+
+def calculate_statistic_data(
+    hist_states: Iterable[HistoricalState],
+    latest: StatisticsRow | None = None,
+) -> list[StatisticData]:
+    """Calculate hourly statistics with a running sum.
+
+    Only the states after the latest statistic are used, so hours already
+    imported are never added to the sum twice.
+    """
+    accumulated = (latest.get("sum") or 0) if latest else 0
+    if latest:
+        hist_states = [hs for hs in hist_states if hs.timestamp > latest["start"]]
+
+    ret = []
+
+    for hs in sorted(hist_states, key=lambda hs: hs.timestamp):
+        accumulated = accumulated + hs.state
+        ret.append(
+            StatisticData(
+                start=datetime.datetime.fromtimestamp(hs.timestamp, datetime.UTC),
+                state=hs.state,
+                sum=accumulated,
+            )
+        )
+
+    return ret
+
+
+def rebase_statistic_data(
+    hist_states: Iterable[HistoricalState],
+    previous: StatisticsRow | None,
+    existing: Iterable[StatisticsRow],
+) -> list[StatisticData]:
+    """Calculate hourly statistics over rows already imported.
+
+    The sum carries on from the previous statistic. Hours with a state take
+    it, and the existing rows without one keep what they added to the sum
+    before, so every row after previous is rebased on the new states.
+    """
+    states = {hs.timestamp: hs.state for hs in hist_states}
+    rows = {row["start"]: row for row in existing}
+    old_sum = (previous.get("sum") or 0) if previous else 0
+    accumulated = old_sum
+
+    ret = []
+
+    for timestamp in sorted(states.keys() | rows.keys()):
+        row = rows.get(timestamp)
+        increment = 0.0
+        if row is not None:
+            row_sum = row.get("sum")
+            if row_sum is not None:
+                increment = row_sum - old_sum
+                old_sum = row_sum
+        if timestamp in states:
+            state = states[timestamp]
+            increment = state
+        else:
+            state = row.get("state")
+        accumulated = accumulated + increment
+        ret.append(
+            StatisticData(
+                start=datetime.datetime.fromtimestamp(timestamp, datetime.UTC),
+                state=state,
+                sum=accumulated,
+            )
+        )
+
+    return ret
+
+
+def get_latest_statistics(
+    hass: HomeAssistant, statistic_ids: list[str]
+) -> dict[str, StatisticsRow]:
+    """Return the latest statistic for each series, from the recorder thread."""
+    latest = {}
+    for statistic_id in statistic_ids:
+        rows = get_last_statistics(hass, 1, statistic_id, True, {"state", "sum"})
+        if rows:
+            latest[statistic_id] = rows[statistic_id][0]
+    return latest
+
+
+class LastStatistics:
+    """The start and sum of the last statistic written, for each series.
+
+    Each series is read from the recorder the first time it's needed, then
+    kept up to date from the rows written, so working out new rows doesn't
+    need the database after that.
+    """
+
+    _hass: HomeAssistant
+    _rows: dict[str, StatisticsRow | None]
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._rows = {}
+
+    def __contains__(self, statistic_id: str) -> bool:
+        return statistic_id in self._rows
+
+    def get(self, statistic_id: str) -> StatisticsRow | None:
+        return self._rows.get(statistic_id)
+
+    async def async_get(self, statistic_id: str) -> StatisticsRow | None:
+        """Return the last statistic of a series, reading it if not known yet."""
+        if statistic_id not in self._rows:
+            latest = await get_instance(self._hass).async_add_executor_job(
+                get_latest_statistics, self._hass, [statistic_id]
+            )
+            self._rows[statistic_id] = latest.get(statistic_id)
+        return self._rows[statistic_id]
+
+    @callback
+    def async_seed(self, statistic_id: str, row: StatisticsRow | None):
+        """Set the last statistic of a series, as read from the recorder."""
+        self._rows[statistic_id] = row
+
+    @callback
+    def async_written(self, statistic_id: str, statistics: list[StatisticData]):
+        """Keep the last of the rows just written to a series."""
+        if statistics:
+            last = statistics[-1]
+            self._rows[statistic_id] = StatisticsRow(
+                start=last["start"].timestamp(), state=last["state"], sum=last["sum"]
+            )
+
+
+@dataclass(slots=True)
+class ImportStatisticsBatchTask(RecorderTask):
+    """Import the statistics for several series as a single recorder job."""
+
+    batch: list[tuple[StatisticMetaData, list[StatisticData]]]
+    attempt: int = 1
+
+    def run(self, instance: Recorder) -> None:
+        retry = [
+            (metadata, statistics)
+            for metadata, statistics in self.batch
+            if not import_statistics(instance, metadata, statistics, Statistics)
+        ]
+        if not retry:
+            return
+        if self.attempt >= IMPORT_MAX_ATTEMPTS:
+            _LOGGER.error(
+                f"could not import statistics for {[m['statistic_id'] for m, _ in retry]}"
+                f" after {self.attempt} attempts"
+            )
+            return
+        instance.queue_task(ImportStatisticsBatchTask(retry, self.attempt + 1))
+
+
+class AuroraPlusStatisticsImporter:
+    """Collect the statistics of all Aurora+ services, and import them together.
+
+    Series queued within IMPORT_BATCH_DELAY of each other, from any tariff or
+    service, cost one recorder job to read all their latest statistics, and one
+    to write them. Series queued with their LastStatistics are only read the
+    first time.
+    """
+
+    _hass: HomeAssistant
+    _pending: dict[
+        str,
+        tuple[StatisticMetaData, list[HistoricalState], LastStatistics | None],
+    ]
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._pending = {}
+        self._unsub_flush = None
+
+    @callback
+    def async_queue(
+        self,
+        metadata: StatisticMetaData,
+        hist_states: list[HistoricalState],
+        last_statistics: LastStatistics | None = None,
+    ) -> None:
+        """Queue the states of one statistic for the next batch.
+
+        States already queued for the statistic are kept, unless the new ones
+        have the same timestamps, in which case the new ones win.
+        """
+        validate_metadata(metadata)
+        statistic_id = metadata["statistic_id"]
+        if statistic_id in self._pending:
+            queued = {hs.timestamp: hs for hs in self._pending[statistic_id][1]}
+            queued |= {hs.timestamp: hs for hs in hist_states}
+            hist_states = sorted(queued.values(), key=lambda hs: hs.timestamp)
+        self._pending[statistic_id] = (metadata, hist_states, last_statistics)
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, IMPORT_BATCH_DELAY, self._async_flush
+            )
+
+    async def _async_flush(self, _now: Any = None) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        recorder = get_instance(self._hass)
+        unknown = [
+            statistic_id
+            for statistic_id, (_, _, last_statistics) in pending.items()
+            if last_statistics is None or statistic_id not in last_statistics
+        ]
+        latest = {}
+        if unknown:
+            latest = await recorder.async_add_executor_job(
+                get_latest_statistics, self._hass, unknown
+            )
+
+        batch = []
+        for statistic_id, (metadata, hist_states, last_statistics) in pending.items():
+            if last_statistics is None:
+                previous = latest.get(statistic_id)
+            else:
+                if statistic_id in unknown:
+                    last_statistics.async_seed(statistic_id, latest.get(statistic_id))
+                previous = last_statistics.get(statistic_id)
+            statistics = calculate_statistic_data(hist_states, previous)
+            try:
+                validate_statistics(metadata, statistics)
+            except ValueError as e:
+                _LOGGER.error(f"not importing {statistic_id}: {e}")
+                continue
+            if statistics:
+                batch.append((metadata, statistics))
+                if last_statistics is not None:
+                    last_statistics.async_written(statistic_id, statistics)
+
+        if not batch:
+            _LOGGER.debug(f"statistics already up to date for {list(pending)}")
+            return
+
+        recorder.queue_task(ImportStatisticsBatchTask(batch))
+        _LOGGER.info(
+            f"importing {sum(len(s) for _, s in batch)} statistics points "
+            f"for {len(batch)} series"
+        )
+
+    async def async_import_since(
+        self,
+        metadata: StatisticMetaData,
+        hist_states: list[HistoricalState],
+        start: datetime.datetime,
+        last_statistics: LastStatistics | None = None,
+    ) -> int:
+        """Import the states of one statistic from a point in time on.
+
+        The sum carries on from the last statistic before start, and every row
+        after it is rewritten, so the sums of later rows are rebased on what's
+        been (re)imported. That includes the rows for hours without a state,
+        such as those imported before the days were cached, which keep their
+        own state and what they added to the sum. Returns the number of rows
+        queued, or raises ValueError if they aren't valid statistics.
+        """
+        validate_metadata(metadata)
+        start_ts = start.timestamp()
+        hist_states = [hs for hs in hist_states if hs.timestamp >= start_ts]
+        if not hist_states:
+            return 0
+
+        recorder = get_instance(self._hass)
+        previous, existing = await recorder.async_add_executor_job(
+            self._get_statistics_from, metadata["statistic_id"], start
+        )
+        statistics = rebase_statistic_data(hist_states, previous, existing)
+        validate_statistics(metadata, statistics)
+        if statistics:
+            recorder.queue_task(ImportStatisticsBatchTask([(metadata, statistics)]))
+            if last_statistics is not None:
+                last_statistics.async_written(metadata["statistic_id"], statistics)
+        _LOGGER.info(
+            f"re-importing {len(statistics)} statistics points "
+            f"for {metadata['statistic_id']} since {start}"
+        )
+        return len(statistics)
+
+    async def async_get_covered_hours(
+        self, statistic_ids: list[str], start: datetime.datetime
+    ) -> dict[str, set[float]]:
+        """Return the start of every hour with a statistic, for each series.
+
+        Only the hours from start on are looked at, in one recorder job.
+        """
+        recorder = get_instance(self._hass)
+        rows = await recorder.async_add_executor_job(
+            self._get_statistics_since, set(statistic_ids), start
+        )
+        return {
+            statistic_id: {row["start"] for row in rows.get(statistic_id, [])}
+            for statistic_id in statistic_ids
+        }
+
+    def _get_statistics_since(
+        self, statistic_ids: set[str], start: datetime.datetime
+    ) -> dict[str, list[StatisticsRow]]:
+        return statistics_during_period(
+            self._hass, start, None, statistic_ids, "hour", None, {"sum"}
+        )
+
+    def _get_statistics_from(
+        self, statistic_id: str, start: datetime.datetime
+    ) -> tuple[StatisticsRow | None, list[StatisticsRow]]:
+        """Return the last statistic before start, and all those since.
+
+        This runs in the recorder thread.
+        """
+        rows = statistics_during_period(
+            self._hass, start, None, {statistic_id}, "hour", None, {"state", "sum"}
+        )
+        existing = rows.get(statistic_id, [])
+        if not existing:
+            # Nothing from start on, so the latest statistic is before it.
+            latest = get_latest_statistics(self._hass, [statistic_id])
+            return latest.get(statistic_id), []
+        return self._get_statistic_before(statistic_id, start), existing
+
+    def _get_statistic_before(
+        self, statistic_id: str, start: datetime.datetime
+    ) -> StatisticsRow | None:
+        """Return the last statistic before start, from the recorder thread.
+
+        Only the day before start is read, unless there's nothing there, in
+        which case the window grows, up to the usage store's retention.
+        """
+        window = datetime.timedelta(days=1)
+        while True:
+            rows = statistics_during_period(
+                self._hass,
+                start - window,
+                start,
+                {statistic_id},
+                "hour",
+                None,
+                {"state", "sum"},
+            )
+            if rows.get(statistic_id):
+                return rows[statistic_id][-1]
+            if window >= STORAGE_RETENTION:
+                return None
+            window = min(window * 8, STORAGE_RETENTION)
+
+
+@callback
+def async_get_importer(hass: HomeAssistant) -> AuroraPlusStatisticsImporter:
+    """Return the statistics importer shared by all Aurora+ services."""
+    if DATA_IMPORTER not in hass.data:
+        hass.data[DATA_IMPORTER] = AuroraPlusStatisticsImporter(hass)
+    return hass.data[DATA_IMPORTER]
@@ -0,0 +1,86 @@
+"""Rate limiting of the calls to Aurora+, shared by all accounts."""
+
+import asyncio
+import logging
+from types import TracebackType
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.hass_dict import HassKey
+
+from .const import (
+    DOMAIN,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_CONCURRENCY,
+    RATE_LIMIT_RATE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_LIMITER: HassKey["AuroraPlusRateLimiter"] = HassKey(f"{DOMAIN}_limiter")
+
+
+class AuroraPlusRateLimiter:
+    """Token bucket and concurrency cap for all calls to Aurora+.
+
+    Up to RATE_LIMIT_BURST calls can start at once, then calls start no faster
+    than RATE_LIMIT_RATE per second, with at most RATE_LIMIT_CONCURRENCY in
+    flight. Callers are served in order.
+    """
+
+    _rate: float
+    _burst: float
+    _tokens: float
+    _updated: float | None
+    _lock: asyncio.Lock
+    _semaphore: asyncio.Semaphore
+
+    def __init__(self, rate: float, burst: int, concurrency: int):
+        self._rate = rate
+        self._burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = None
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self) -> None:
+        await self._semaphore.acquire()
+        try:
+            await self._async_take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._semaphore.release()
+
+    async def _async_take_token(self):
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(
+                        self._burst, self._tokens + (now - self._updated) * self._rate
+                    )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self._rate
+                _LOGGER.debug(f"rate limited, waiting {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+
+@callback
+def async_get_limiter(hass: HomeAssistant) -> AuroraPlusRateLimiter:
+    """Return the rate limiter shared by all Aurora+ accounts."""
+    if DATA_LIMITER not in hass.data:
+        hass.data[DATA_LIMITER] = AuroraPlusRateLimiter(
+            RATE_LIMIT_RATE, RATE_LIMIT_BURST, RATE_LIMIT_CONCURRENCY
+        )
+    return hass.data[DATA_LIMITER]
@@ -0,0 +1,103 @@
+"""Data published by the coordinator for each refresh."""
+
+import datetime
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from .aggregates import PeriodStarts, PeriodTotals
+from .store import UsageColumns
+
+UsageTotals = Mapping[str, Mapping[str, float]]
+Usage = Mapping[str, Mapping[str, tuple[tuple[float, ...], tuple[float, ...]]]]
+
+
+def _parse(value: Any, kind: type[float] | type[int]) -> float | int | None:
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class AuroraPlusBalance:
+    """The account's balance and bills, as last returned by getcurrent."""
+
+    estimated_balance: float | None
+    amount_owed: float | None
+    average_daily_usage: float | None
+    usage_days_remaining: int | None
+    actual_balance: float | None
+    unbilled_amount: float | None
+    bill_total_amount: float | None
+    number_of_unpaid_bills: int | None
+    bill_overdue_amount: float | None
+
+    @classmethod
+    def from_api(cls, api: Any) -> "AuroraPlusBalance | None":
+        """Parse the balance held by either API client, if it has one yet."""
+        if getattr(api, "EstimatedBalance", None) is None:
+            return None
+        return cls(
+            estimated_balance=_parse(api.EstimatedBalance, float),
+            amount_owed=_parse(getattr(api, "AmountOwed", None), float),
+            average_daily_usage=_parse(getattr(api, "AverageDailyUsage", None), float),
+            usage_days_remaining=_parse(getattr(api, "UsageDaysRemaining", None), int),
+            actual_balance=_parse(getattr(api, "ActualBalance", None), float),
+            unbilled_amount=_parse(getattr(api, "UnbilledAmount", None), float),
+            bill_total_amount=_parse(getattr(api, "BillTotalAmount", None), float),
+            number_of_unpaid_bills=_parse(
+                getattr(api, "NumberOfUnpaidBills", None), int
+            ),
+            bill_overdue_amount=_parse(getattr(api, "BillOverDueAmount", None), float),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AuroraPlusData:
+    """Everything entities show, as of one refresh.
+
+    A new snapshot replaces the previous one after each refresh, so entities
+    never see data from a fetch that is still running. The mappings are
+    read-only.
+    """
+
+    balance: AuroraPlusBalance | None
+    usage_date: datetime.date | None
+    totals: UsageTotals
+    tariffs: tuple[str, ...]
+    usage: Usage
+    period_totals: PeriodTotals
+    period_starts: PeriodStarts
+
+    @classmethod
+    def build(
+        cls,
+        balance: AuroraPlusBalance | None,
+        usage_date: datetime.date | None,
+        totals: dict[str, dict[str, float]],
+        tariffs: list[str],
+        usage: UsageColumns,
+        period_totals: PeriodTotals,
+        period_starts: PeriodStarts,
+    ) -> "AuroraPlusData":
+        return cls(
+            balance=balance,
+            usage_date=usage_date,
+            totals=MappingProxyType(
+                {field: MappingProxyType(dict(t)) for field, t in totals.items()}
+            ),
+            tariffs=tuple(tariffs),
+            usage=MappingProxyType(
+                {field: MappingProxyType(t) for field, t in usage.items()}
+            ),
+            period_totals=period_totals,
+            period_starts=period_starts,
+        )
+
+    def usage_columns(
+        self, field: str, tariff: str
+    ) -> tuple[tuple[float, ...], tuple[float, ...]]:
+        """Return the timestamps and values of the new days for one tariff."""
+        return self.usage.get(field, {}).get(tariff, ((), ()))
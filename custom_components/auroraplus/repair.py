@@ -0,0 +1,160 @@
+"""Detection and repair of the hours missing from the imported statistics."""
+
+import datetime
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import REPAIR_MAX_FETCH
+from .importer import async_get_importer
+from .resilience import API_ERRORS
+from .store import normalise_day
+
+if TYPE_CHECKING:
+    from .coordinator import AuroraPlusCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RepairedStatistic:
+    """A statistic to check, and how to re-import it from a date on."""
+
+    field: str
+    tariff: str
+    statistic_id: Callable[[], str]
+    async_import_since: Callable[[datetime.date], Awaitable[int]]
+
+
+def find_gap_days(
+    timestamps: Iterable[float], covered: set[float]
+) -> list[datetime.date]:
+    """Return the local dates, in order, of the hours missing from covered."""
+    return sorted(
+        {
+            dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).date()
+            for timestamp in timestamps
+            if timestamp not in covered
+        }
+    )
+
+
+class AuroraPlusStatisticsRepair:
+    """Find the holes in the statistics of one service, and fill them in.
+
+    Each check first refetches the days missing from the usage store between
+    the oldest and latest days it holds (at most REPAIR_MAX_FETCH of them).
+    It then indexes the hours each registered statistic has in the recorder,
+    and compares them with the records held for its tariff. A statistic with
+    hours missing is re-imported from the first day with a gap, which also
+    rebases the sums of all the rows after it. Statistics without gaps are
+    left alone.
+
+    Days Aurora+ had no data for aren't asked for again until a restart.
+    """
+
+    _hass: HomeAssistant
+    _coordinator: "AuroraPlusCoordinator"
+    _statistics: list[RepairedStatistic]
+    _empty_days: set[datetime.date]
+    _running: bool
+
+    result: dict[str, Any]
+
+    def __init__(self, hass: HomeAssistant, coordinator: "AuroraPlusCoordinator"):
+        self._hass = hass
+        self._coordinator = coordinator
+        self._statistics = []
+        self._empty_days = set()
+        self._running = False
+        self.result = {}
+
+    @callback
+    def async_add_statistic(self, statistic: RepairedStatistic) -> Callable[[], None]:
+        """Register a statistic to check."""
+        self._statistics.append(statistic)
+        return lambda: self._statistics.remove(statistic)
+
+    async def async_check(self, _now: Any = None) -> None:
+        """Check the statistics for gaps, and repair them.
+
+        Nothing is done while a backfill or another check is running.
+        """
+        if self._running or self._coordinator.backfill.running:
+            return
+        self._running = True
+        try:
+            await self._async_check()
+        finally:
+            self._running = False
+
+    async def _async_check(self):
+        usage_store = self._coordinator.usage_store
+        dates = usage_store.dates()
+        if not dates or not self._statistics:
+            return
+
+        refetched = await self._async_refetch(dates[0], dates[-1])
+
+        statistics = list(self._statistics)
+        importer = async_get_importer(self._hass)
+        covered = await importer.async_get_covered_hours(
+            [statistic.statistic_id() for statistic in statistics],
+            dt_util.start_of_local_day(dates[0]),
+        )
+        columns = usage_store.usage_columns_since(dates[0])
+
+        repaired = {}
+        for statistic in statistics:
+            statistic_id = statistic.statistic_id()
+            timestamps, _values = columns.get(statistic.field, {}).get(
+                statistic.tariff, ((), ())
+            )
+            gaps = find_gap_days(timestamps, covered.get(statistic_id, set()))
+            if not gaps:
+                continue
+            _LOGGER.info(
+                f"{statistic_id} is missing hours on {len(gaps)} days, "
+                f"re-importing from {gaps[0]}"
+            )
+            repaired[statistic_id] = await statistic.async_import_since(gaps[0])
+
+        self.result = {
+            "checked": len(statistics),
+            "refetched": refetched,
+            "repaired": repaired,
+        }
+        _LOGGER.debug(f"statistics check for {self._coordinator.name}: {self.result}")
+
+    async def _async_refetch(self, first: datetime.date, last: datetime.date) -> int:
+        """Fetch the days missing from the usage store, and return how many."""
+        usage_store = self._coordinator.usage_store
+        missing = [
+            date
+            for i in range((last - first).days + 1)
+            if (date := first + datetime.timedelta(days=i)) not in usage_store
+            and date not in self._empty_days
+        ][:REPAIR_MAX_FETCH]
+        if not missing:
+            return 0
+
+        _LOGGER.info(f"refetching {len(missing)} days missing since {first}")
+        today = dt_util.now().date()
+        days = {}
+        for date in missing:
+            try:
+                day = await self._coordinator.async_fetch_day((date - today).days)
+            except API_ERRORS as e:
+                _LOGGER.warning(f"could not refetch {date}: {e}")
+                continue
+            if day.get("NoDataFlag"):
+                self._empty_days.add(date)
+                continue
+            days[date] = normalise_day(day)
+        if days:
+            await usage_store.async_set_days(days)
+        return len(days)
@@ -0,0 +1,220 @@
+"""Retries, backoff and circuit breaking for calls to Aurora+."""
+
+import asyncio
+import datetime
+import email.utils
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import aiohttp
+from requests.exceptions import HTTPError, RequestException
+
+from auroraplus import AuroraPlusAuthenticationError
+
+from .api import is_auth_error
+from .const import (
+    BREAKER_MAX_RESET_TIMEOUT,
+    BREAKER_RESET_TIMEOUT,
+    BREAKER_THRESHOLD,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+ERROR_AUTH = "auth"
+ERROR_THROTTLED = "throttled"
+ERROR_TRANSIENT = "transient"
+ERROR_PERMANENT = "permanent"
+
+
+class CircuitOpenError(Exception):
+    """Aurora+ is failing, and isn't being called for now."""
+
+
+# What a call to Aurora+ raises when it fails, rather than because of a bug.
+# Background work that can carry on without one call catches these only.
+API_ERRORS = (
+    aiohttp.ClientError,
+    RequestException,
+    asyncio.TimeoutError,
+    CircuitOpenError,
+    AuroraPlusAuthenticationError,
+)
+
+
+def _error_status(e: Exception) -> int | None:
+    if isinstance(e, aiohttp.ClientResponseError):
+        return e.status
+    if isinstance(e, HTTPError) and e.response is not None:
+        return e.response.status_code
+    return None
+
+
+def classify_error(e: Exception) -> str:
+    """Return whether an error is worth retrying, and why."""
+    if is_auth_error(e):
+        return ERROR_AUTH
+    status = _error_status(e)
+    if status == 429:
+        return ERROR_THROTTLED
+    if status is not None:
+        return ERROR_TRANSIENT if status >= 500 else ERROR_PERMANENT
+    # Connection errors and timeouts from either client.
+    if isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError, OSError)):
+        return ERROR_TRANSIENT
+    return ERROR_PERMANENT
+
+
+def retry_after(e: Exception) -> float | None:
+    """Return the delay asked for in a Retry-After header, in seconds."""
+    headers = None
+    if isinstance(e, aiohttp.ClientResponseError):
+        headers = e.headers
+    elif isinstance(e, HTTPError) and e.response is not None:
+        headers = e.response.headers
+    value = headers.get("Retry-After") if headers else None
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.datetime.now(datetime.UTC)
+    return max((when - now).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return an exponential delay for an attempt, with jitter."""
+    delay = min(RETRY_BACKOFF * 2**attempt, RETRY_MAX_DELAY)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Stop calling Aurora+ for an account after repeated failures.
+
+    After BREAKER_THRESHOLD calls in a row failed (after retries), the circuit
+    opens, and calls fail straight away with CircuitOpenError. Once the reset
+    timeout has passed, a single call is let through as a probe: if it works,
+    the circuit closes; if not, it opens again for twice as long, up to
+    BREAKER_MAX_RESET_TIMEOUT. A throttling response with a Retry-After opens
+    the circuit for that long.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    name: str
+    state: str
+    _failures: int
+    _open_until: float
+    _reset_timeout: float
+    _probing: bool
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = self.CLOSED
+        self._failures = 0
+        self._open_until = 0.0
+        self._reset_timeout = BREAKER_RESET_TIMEOUT
+        self._probing = False
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call mustn't go ahead."""
+        if self.state == self.OPEN:
+            remaining = self._open_until - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(
+                    f"{self.name}: Aurora+ is failing, next try in {remaining:.0f}s"
+                )
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(f"{self.name}: waiting for Aurora+ to recover")
+            self._probing = True
+
+    def release(self):
+        """Give up on a call without an outcome, such as when it's cancelled."""
+        self._probing = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            _LOGGER.info(f"{self.name}: Aurora+ recovered")
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+        self._reset_timeout = BREAKER_RESET_TIMEOUT
+
+    def record_failure(self, delay: float | None = None):
+        self._probing = False
+        if self.state == self.HALF_OPEN:
+            self._reset_timeout = min(
+                2 * self._reset_timeout, BREAKER_MAX_RESET_TIMEOUT
+            )
+            self._open(delay)
+            return
+        self._failures += 1
+        if delay is not None or self._failures >= BREAKER_THRESHOLD:
+            self._open(delay)
+
+    def _open(self, delay: float | None):
+        timeout = max(self._reset_timeout, delay or 0.0)
+        self.state = self.OPEN
+        self._open_until = time.monotonic() + timeout
+        _LOGGER.warning(
+            f"{self.name}: Aurora+ is failing, pausing calls for {timeout:.0f}s"
+        )
+
+
+async def async_call_with_retry(
+    call: Callable[[], Awaitable[_T]], breaker: CircuitBreaker, *, name: Any = None
+) -> _T:
+    """Make a call, retrying transient failures with backoff.
+
+    Authentication and permanent errors are raised straight away. Throttling
+    and transient errors are retried up to RETRY_ATTEMPTS times, waiting as
+    long as a Retry-After header asks when there is one, unless that's longer
+    than RETRY_MAX_DELAY. Calls that still fail count against the breaker.
+    """
+    breaker.before_call()
+    attempt = 0
+    while True:
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            kind = classify_error(e)
+            if kind in (ERROR_AUTH, ERROR_PERMANENT):
+                # Aurora+ answered, the breaker has nothing to do with it.
+                breaker.record_success()
+                raise
+            asked = retry_after(e)
+            if (
+                attempt + 1 >= RETRY_ATTEMPTS
+                or asked is not None
+                and asked > RETRY_MAX_DELAY
+            ):
+                breaker.record_failure(asked if kind == ERROR_THROTTLED else None)
+                raise
+            delay = asked if asked is not None else backoff_delay(attempt)
+            _LOGGER.debug(
+                f"{name or call}: {kind} error ({e!r}), retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+        else:
+            breaker.record_success()
+            return result
@@ -0,0 +1,113 @@
+"""Adaptive polling schedule, following when Aurora+ publishes new data."""
+
+import datetime
+import math
+import statistics
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ADAPTIVE_DENSE_INTERVAL,
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_MAX_MARGIN,
+    ADAPTIVE_MAX_OBSERVATIONS,
+    ADAPTIVE_MIN_MARGIN,
+)
+
+
+DAY = datetime.timedelta(days=1)
+
+
+class PublishTimeModel:
+    """When new daily data shows up for an account, by local time of day.
+
+    Observations are the times (as timestamps) new data was first seen, most
+    recent last. The expected publication time is the median time of day, and
+    the window around it spans the observations, within ADAPTIVE_MIN_MARGIN and
+    ADAPTIVE_MAX_MARGIN either side.
+
+    Times of day wrap around midnight, so data published either side of it
+    makes a window across midnight, rather than one around midday.
+    """
+
+    observations: list[float]
+
+    def __init__(self, observations: list[float] | None = None):
+        self.observations = list(observations or [])[-ADAPTIVE_MAX_OBSERVATIONS:]
+
+    def record(self, when: datetime.datetime):
+        self.observations = (self.observations + [when.timestamp()])[
+            -ADAPTIVE_MAX_OBSERVATIONS:
+        ]
+
+    def last_seen(self) -> datetime.datetime | None:
+        """Return the local time new data was last seen."""
+        if not self.observations:
+            return None
+        return dt_util.as_local(dt_util.utc_from_timestamp(self.observations[-1]))
+
+    def window(self) -> tuple[datetime.timedelta, datetime.timedelta] | None:
+        """Return the expected publication window, as offsets from midnight.
+
+        A window across midnight starts before 00:00 (a negative offset) or
+        ends after 24:00.
+        """
+        if not self.observations:
+            return None
+        seconds = []
+        for timestamp in self.observations:
+            local = dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+            seconds.append((local - dt_util.start_of_local_day(local)).total_seconds())
+
+        # Unwrap the times of day around their circular mean, so those either
+        # side of midnight are next to each other, then take the median.
+        day = DAY.total_seconds()
+        angles = [2 * math.pi * s / day for s in seconds]
+        mean = math.atan2(
+            sum(math.sin(a) for a in angles), sum(math.cos(a) for a in angles)
+        )
+        mean = mean % (2 * math.pi) * day / (2 * math.pi)
+        offsets = [
+            datetime.timedelta(
+                seconds=round(mean + (s - mean + day / 2) % day - day / 2)
+            )
+            for s in seconds
+        ]
+        median = statistics.median(offsets)
+        spread = max(abs(offset - median) for offset in offsets)
+        median -= DAY * (median // DAY)
+        margin = min(max(spread, ADAPTIVE_MIN_MARGIN), ADAPTIVE_MAX_MARGIN)
+        return median - margin, median + margin
+
+    def next_update_interval(
+        self,
+        now: datetime.datetime,
+        fixed_interval: datetime.timedelta,
+        last_new_data: datetime.datetime | None,
+    ) -> datetime.timedelta:
+        """Return how long to wait before polling again.
+
+        Each day's data is expected within the 24 hours around the middle of
+        its window. Poll densely within the window until new data has been
+        seen for the day, then wait until the next day's window. Without
+        observations yet, or once past the window with nothing new, poll at
+        the fixed interval.
+        """
+        window = self.window()
+        if window is None:
+            return fixed_interval
+        expected = dt_util.start_of_local_day(now) + (window[0] + window[1]) / 2
+        expected += DAY * round((now - expected) / DAY)
+        margin = (window[1] - window[0]) / 2
+        window_start, window_end = expected - margin, expected + margin
+
+        if last_new_data is not None and last_new_data >= expected - DAY / 2:
+            wait = window_start + DAY - now
+        elif now < window_start:
+            wait = window_start - now
+        elif now <= window_end:
+            return ADAPTIVE_DENSE_INTERVAL
+        else:
+            return fixed_interval
+
+        return min(max(wait, ADAPTIVE_DENSE_INTERVAL), ADAPTIVE_MAX_INTERVAL)
@@ -6,7 +6,7 @@ from typing import Any, override
 
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import (
     IntegrationError,
 )
@@ -20,16 +20,25 @@ from homeassistant.components.recorder.models import (
     StatisticData,
     StatisticMetaData,
 )
-from homeassistant.components.recorder.statistics import StatisticsRow
+from homeassistant.components.recorder.statistics import (
+    StatisticsRow,
+    async_add_external_statistics,
+)
 from homeassistant.components.sensor.const import (
     SensorDeviceClass,
 )
 from homeassistant.const import (
     CURRENCY_DOLLAR,
+    MATCH_ALL,
+    PERCENTAGE,
+    EntityCategory,
     UnitOfEnergy,
+    UnitOfTime,
 )
 
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from homeassistant_historical_sensor import (
     HistoricalSensor,
@@ -37,11 +46,22 @@ from homeassistant_historical_sensor import (
 )
 
 from custom_components.auroraplus.coordinator import AuroraPlusCoordinator
+from custom_components.auroraplus.importer import (
+    async_get_importer,
+    calculate_statistic_data,
+)
+from custom_components.auroraplus.models import Usage
+from custom_components.auroraplus.repair import RepairedStatistic
 
 from .const import (
+    CONF_BATCH_STATISTICS,
+    CONF_COMPACT_ATTRIBUTES,
     DEFAULT_MONITORED,
     DEFAULT_ROUNDING,
+    PERIOD_NAMES,
+    PERIODS,
     SENSORS_MONETARY,
+    SENSOR_BACKFILLPROGRESS,
     SENSOR_DOLLARVALUEUSAGE,
     SENSOR_DOLLARVALUEUSAGETARIFF,
     SENSOR_ESTIMATEDBALANCE,
@@ -53,6 +73,19 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Details of the balance: attribute of the estimated balance (and name of their
+# diagnostic sensors), field of AuroraPlusBalance, and unit.
+BALANCE_FIELDS = [
+    ("Amount Owed", "amount_owed", CURRENCY_DOLLAR),
+    ("Average Daily Usage", "average_daily_usage", CURRENCY_DOLLAR),
+    ("Usage Days Remaining", "usage_days_remaining", UnitOfTime.DAYS),
+    ("Actual Balance", "actual_balance", CURRENCY_DOLLAR),
+    ("Unbilled Amount", "unbilled_amount", CURRENCY_DOLLAR),
+    ("Bill Total Amount", "bill_total_amount", CURRENCY_DOLLAR),
+    ("Number Of Unpaid Bills", "number_of_unpaid_bills", None),
+    ("Bill Overdue Amount", "bill_overdue_amount", CURRENCY_DOLLAR),
+]
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -65,12 +98,27 @@ async def async_setup_entry(
     rounding = DEFAULT_ROUNDING
 
     coordinator = config_entry.runtime_data
-    await coordinator.async_update()
+    tariffs: list[str] = []
 
-    tariffs = coordinator.week.get("TariffTypes")
+    @callback
+    def async_add_tariff_sensors():
+        """Add historical sensors for the tariffs not seen before.
 
-    sensors_energy = [f"{SENSOR_KILOWATTHOURUSAGETARIFF} {t}" for t in tariffs]
-    sensors_cost = [f"{SENSOR_DOLLARVALUEUSAGETARIFF} {t}" for t in tariffs]
+        Tariffs are found in the usage data, so sensors for a new one show up
+        with its first data.
+        """
+        new = [t for t in coordinator.data.tariffs if t not in tariffs]
+        if not new:
+            return
+        if tariffs:
+            _LOGGER.info(f"Aurora+ adding sensors for new tariffs {new}")
+        tariffs.extend(new)
+        sensors_energy = [f"{SENSOR_KILOWATTHOURUSAGETARIFF} {t}" for t in new]
+        sensors_cost = [f"{SENSOR_DOLLARVALUEUSAGETARIFF} {t}" for t in new]
+        async_add_entities(
+            AuroraHistoricalSensor(hass, sensor, name, coordinator, rounding)
+            for sensor in sensors_energy + sensors_cost
+        )
 
     async_add_entities(
         [
@@ -78,22 +126,40 @@ async def async_setup_entry(
             for sensor in DEFAULT_MONITORED
         ]
         + [
-            AuroraHistoricalSensor(hass, sensor, name, coordinator, rounding)
-            for sensor in sensors_energy + sensors_cost
-        ],
-        True,
+            AuroraPeriodSensor(hass, sensor, name, coordinator, period, rounding)
+            for sensor in [SENSOR_KILOWATTHOURUSAGE, SENSOR_DOLLARVALUEUSAGE]
+            for period in PERIODS
+        ]
+        + [
+            AuroraBalanceSensor(hass, sensor, name, coordinator, field, unit)
+            for sensor, field, unit in BALANCE_FIELDS
+        ]
+        + [AuroraBackfillSensor(hass, SENSOR_BACKFILLPROGRESS, name, coordinator)],
+    )
+    async_add_tariff_sensors()
+    config_entry.async_on_unload(
+        coordinator.async_add_listener(async_add_tariff_sensors)
     )
 
     _LOGGER.info(f"Aurora+ platform ready with tariffs {tariffs}")
 
 
-class AuroraSensor(SensorEntity):
-    """Representation of a Aurora+ sensor."""
+class AuroraSensor(CoordinatorEntity[AuroraPlusCoordinator], SensorEntity):
+    """Representation of a Aurora+ sensor.
+
+    The attributes (usage per tariff, or details of the balance) change with
+    most updates, so they aren't recorded with each state. In compact mode,
+    there are none at all.
+    """
+
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     _hass: HomeAssistant
     _name: str
     _sensor: str
     _state: Any  # XXX
+    _attributes: dict[str, Any] | None
+    _available: bool
     _last_reset: datetime.datetime
     _coordinator: AuroraPlusCoordinator
     _uniqueid: str
@@ -108,10 +174,13 @@ class AuroraSensor(SensorEntity):
         rounding: int,
     ):
         """Initialize the Aurora+ sensor."""
+        super().__init__(coordinator)
         self._hass = hass
         self._name = name + " " + coordinator.service_agreement_id + " " + sensor
         self._sensor = sensor
         self._state = None
+        self._attributes = None
+        self._available = coordinator.last_update_success
         self._last_reset = datetime.datetime.strptime("1970", "%Y")
         self._coordinator = coordinator
         self._uniqueid = self._name.replace(" ", "_").lower()
@@ -174,43 +243,65 @@ class AuroraSensor(SensorEntity):
 
     @property
     @override
-    def extra_state_attributes(self) -> Any:
+    def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return device state attributes."""
-        if self._sensor == SENSOR_DOLLARVALUEUSAGE:
-            return self._coordinator.DollarValueUsage
+        return self._attributes
+
+    def _update_attributes(self):
+        """Collect the attributes, once per update rather than on each read."""
+        data = self._coordinator.data
+        if self._coordinator.config_entry.options.get(CONF_COMPACT_ATTRIBUTES):
+            self._attributes = None
+        elif self._sensor == SENSOR_DOLLARVALUEUSAGE:
+            self._attributes = dict(data.totals.get("DollarValueUsage", {}))
         elif self._sensor == SENSOR_KILOWATTHOURUSAGE:
-            return self._coordinator.KilowattHourUsage
+            self._attributes = dict(data.totals.get("KilowattHourUsage", {}))
         elif self._sensor == SENSOR_ESTIMATEDBALANCE:
-            attributes = {}
-            attributes["Amount Owed"] = self._coordinator.AmountOwed
-            attributes["Average Daily Usage"] = self._coordinator.AverageDailyUsage
-            attributes["Usage Days Remaining"] = self._coordinator.UsageDaysRemaining
-            attributes["Actual Balance"] = self._coordinator.ActualBalance
-            attributes["Unbilled Amount"] = self._coordinator.UnbilledAmount
-            attributes["Bill Total Amount"] = self._coordinator.BillTotalAmount
-            attributes["Number Of Unpaid Bills"] = self._coordinator.NumberOfUnpaidBills
-            attributes["Bill Overdue Amount"] = self._coordinator.BillOverDueAmount
-            return attributes
-
-    async def async_update(self):
-        """Collect updated data from Aurora+ API."""
-        await self._coordinator.async_update()
+            balance = data.balance
+            self._attributes = {
+                attribute: getattr(balance, field) if balance else None
+                for attribute, field, _unit in BALANCE_FIELDS
+            }
+
+    async def async_added_to_hass(self) -> None:
+        """Pick up any data the coordinator already has."""
+        await super().async_added_to_hass()
+        self._update_state()
+
+    @callback
+    @override
+    def _handle_coordinator_update(self) -> None:
+        """Update the state from data pushed by the coordinator.
 
+        The state is only written if it, the attributes, or the availability
+        (which follows the last refresh) changed.
+        """
+        previous = (self._state, self._attributes, self._available)
+        self._update_state()
+        self._available = self.available
+        if (self._state, self._attributes, self._available) == previous:
+            return
+        self.async_write_ha_state()
+
+    def _update_state(self):
+        """Collect updated data from the coordinator."""
         previous_state = self._state
+        self._update_attributes()
+        data = self._coordinator.data
+        totals = data.totals
         if self._sensor == SENSOR_ESTIMATEDBALANCE:
-            estimated_balance = self._coordinator.EstimatedBalance
-            try:
-                self._state = round(float(estimated_balance), self._rounding)
-            except TypeError:
+            if data.balance is None or data.balance.estimated_balance is None:
                 self._state = None
+            else:
+                self._state = round(data.balance.estimated_balance, self._rounding)
         elif self._sensor == SENSOR_DOLLARVALUEUSAGE:
             self._state = round(
-                self._coordinator.DollarValueUsage.get("Total", float("nan")),
+                totals.get("DollarValueUsage", {}).get("Total", float("nan")),
                 self._rounding,
             )
         elif self._sensor == SENSOR_KILOWATTHOURUSAGE:
             self._state = round(
-                self._coordinator.KilowattHourUsage.get("Total", float("nan")),
+                totals.get("KilowattHourUsage", {}).get("Total", float("nan")),
                 self._rounding,
             )
 
@@ -228,6 +319,9 @@ class AuroraHistoricalSensor(HistoricalSensor, SensorEntity):
     _coordinator: AuroraPlusCoordinator
     _uniqueid: str
     _rounding: int
+    _tariff: str
+    _field: str
+    _usage: Usage | None
 
     def __init__(
         self,
@@ -245,8 +339,73 @@ class AuroraHistoricalSensor(HistoricalSensor, SensorEntity):
         self._coordinator = coordinator
         self._uniqueid = self._name.replace(" ", "_").lower()
         self._rounding = rounding
+        self._usage = None
+        if self.device_class == SensorDeviceClass.MONETARY:
+            self._tariff = sensor.removeprefix(SENSOR_DOLLARVALUEUSAGETARIFF).strip()
+            self._field = "DollarValueUsage"
+        else:
+            self._tariff = sensor.removeprefix(SENSOR_KILOWATTHOURUSAGETARIFF).strip()
+            self._field = "KilowattHourUsage"
         _LOGGER.debug(f"{self._sensor} created (historical)")
 
+    @property
+    @override
+    def should_poll(self) -> bool:
+        return False
+
+    @override
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the coordinator instead of polling.
+
+        HistoricalSensor.async_added_to_hass sets up its own polling loop, so
+        we skip it and go straight to SensorEntity's. Statistics are written
+        whenever the coordinator pushes new data.
+        """
+        await super(HistoricalSensor, self).async_added_to_hass()
+        self._remove_time_tracker_fn = None
+        self.async_on_remove(
+            self._coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+        self.async_on_remove(
+            self._coordinator.backfill.async_add_importer(self.async_import_history)
+        )
+        self.async_on_remove(
+            self._coordinator.repair.async_add_statistic(
+                RepairedStatistic(
+                    field=self._field,
+                    tariff=self._tariff,
+                    statistic_id=lambda: self.get_statistic_metadata()["statistic_id"],
+                    async_import_since=self.async_import_history,
+                )
+            )
+        )
+        await self._async_historical_handle_update()
+
+    async def async_import_history(self, since: datetime.date) -> int:
+        """Re-import statistics from a date on, from the usage store.
+
+        This is used after a backfill, and to fill in the gaps found in the
+        statistics. Returns the number of rows queued.
+        """
+        columns = self._coordinator.usage_store.usage_columns_since(since)
+        timestamps, values = columns.get(self._field, {}).get(self._tariff, ((), ()))
+        return await async_get_importer(self.hass).async_import_since(
+            self.get_statistic_metadata(),
+            [
+                HistoricalState(state=value, timestamp=timestamp)
+                for timestamp, value in zip(timestamps, values)
+            ],
+            dt_util.start_of_local_day(since),
+            self._coordinator.last_statistics,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Nothing to do unless new days came in.
+        if self._coordinator.data.usage is self._usage:
+            return
+        self.hass.async_create_task(self._async_historical_handle_update())
+
     @property
     @override
     def name(self) -> str:
@@ -302,40 +461,57 @@ class AuroraHistoricalSensor(HistoricalSensor, SensorEntity):
         return self._attr_historical_states
 
     async def async_update_historical(self):
-        if self.device_class == SensorDeviceClass.MONETARY:
-            tariff = self._sensor.removeprefix(SENSOR_DOLLARVALUEUSAGETARIFF).strip()
-            field = "DollarValueUsage"
-        elif self._sensor.startswith(SENSOR_KILOWATTHOURUSAGETARIFF):
-            tariff = self._sensor.removeprefix(SENSOR_KILOWATTHOURUSAGETARIFF).strip()
-            field = "KilowattHourUsage"
-
-        await self._coordinator.async_update()
-
-        metered_records = self._coordinator.day.get("MeteredUsageRecords")
-        if metered_records is None:
-            _LOGGER.warning(
-                f"{self._sensor}: no metered records, can't obtain hourly data"
-            )
-            return
+        data = self._coordinator.data
+        self._usage = data.usage
+        timestamps, values = data.usage_columns(self._field, self._tariff)
 
         self._attr_historical_states = [
-            HistoricalState(
-                state=abs(float(r[field][tariff])),
-                timestamp=datetime.datetime.fromisoformat(r["StartTime"]).timestamp(),
-            )
-            for r in metered_records
-            if r and r.get(field) and r.get(field).get(tariff)
+            HistoricalState(state=value, timestamp=timestamp)
+            for timestamp, value in zip(timestamps, values)
         ]
 
         if not self._attr_historical_states:
             _LOGGER.debug(
-                f"{self._sensor}: empty historical states for tariff {tariff}"
+                f"{self._sensor}: empty historical states for tariff {self._tariff}"
             )
 
         _LOGGER.debug(
             f"{self._sensor}: historical states: %s", self._attr_historical_states
         )
 
+    @override
+    async def async_write_historical(self):
+        """Write statistics for the hours not imported yet.
+
+        Unlike HistoricalSensor's, this doesn't drop the hour right after the
+        last one imported, and doesn't write anything if there is nothing new.
+        The last statistic is only read from the recorder the first time.
+        """
+        if not self.historical_states:
+            _LOGGER.debug(f"{self._sensor}: no historical states available")
+            return
+
+        metadata = self.get_statistic_metadata()
+        if self._coordinator.config_entry.options.get(CONF_BATCH_STATISTICS):
+            # Imported along with all other tariffs and services.
+            async_get_importer(self.hass).async_queue(
+                metadata, self.historical_states, self._coordinator.last_statistics
+            )
+            return
+
+        last_statistics = self._coordinator.last_statistics
+        latest = await last_statistics.async_get(metadata["statistic_id"])
+        statistics = await self.async_calculate_statistic_data(
+            self.historical_states, latest=latest
+        )
+        if not statistics:
+            _LOGGER.debug(f"{self._sensor}: statistics already up to date")
+            return
+
+        async_add_external_statistics(self.hass, metadata, statistics)
+        last_statistics.async_written(metadata["statistic_id"], statistics)
+        _LOGGER.info(f"{self._sensor}: added {len(statistics)} statistics points")
+
     def get_statistic_metadata(self) -> StatisticMetaData:
         meta = super().get_statistic_metadata()
         meta["has_sum"] = True
@@ -357,19 +533,215 @@ class AuroraHistoricalSensor(HistoricalSensor, SensorEntity):
         cost only, both as part of the same data array. The format allows us to
         calculate correct statistics by simply ignoring the empty records.
         """
-        accumulated = latest.get("sum", 0) if latest else 0
-
-        ret = []
-
-        for hs in hist_states:
-            accumulated = accumulated + hs.state
-            ret.append(
-                StatisticData(
-                    start=datetime.datetime.fromtimestamp(hs.timestamp, datetime.UTC),
-                    state=hs.state,
-                    sum=accumulated,
-                )
-            )
+        ret = calculate_statistic_data(hist_states, latest)
 
         _LOGGER.debug(f"{self._sensor}: calculated statistics %s", ret)
         return ret
+
+
+class AuroraPeriodSensor(CoordinatorEntity[AuroraPlusCoordinator], SensorEntity):
+    """Usage since the start of the week, month or billing period.
+
+    The total is the state, and the usage per tariff the attributes (unless
+    compact), which aren't recorded, as with AuroraSensor. The period is that
+    of the latest day with data.
+    """
+
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+    _attr_state_class = SensorStateClass.TOTAL
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        sensor: str,
+        name: str,
+        coordinator: AuroraPlusCoordinator,
+        period: str,
+        rounding: int,
+    ):
+        """Initialize the Aurora+ sensor."""
+        super().__init__(coordinator)
+        self._hass = hass
+        self._name = (
+            f"{name} {coordinator.service_agreement_id} {sensor} {PERIOD_NAMES[period]}"
+        )
+        self._sensor = sensor
+        self._coordinator = coordinator
+        self._uniqueid = self._name.replace(" ", "_").lower()
+        self._period = period
+        self._rounding = rounding
+        self._available = coordinator.last_update_success
+        if sensor in SENSORS_MONETARY:
+            self._field = "DollarValueUsage"
+            self._attr_device_class = SensorDeviceClass.MONETARY
+            self._attr_native_unit_of_measurement = CURRENCY_DOLLAR
+        else:
+            self._field = "KilowattHourUsage"
+            self._attr_device_class = SensorDeviceClass.ENERGY
+            self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+        self._update_state()
+        _LOGGER.debug(f"{self._name} created")
+
+    @property
+    @override
+    def name(self) -> str:
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    @override
+    def unique_id(self) -> str:
+        """Return the unique_id of the sensor."""
+        return self._uniqueid
+
+    def _update_state(self):
+        data = self._coordinator.data
+        tariffs = data.period_totals.get(self._period, {}).get(self._field, {})
+        total = tariffs.get("Total")
+        self._attr_native_value = (
+            round(total, self._rounding) if total is not None else None
+        )
+        start = data.period_starts.get(self._period)
+        self._attr_last_reset = (
+            dt_util.start_of_local_day(start) if start is not None else None
+        )
+        if self._coordinator.config_entry.options.get(CONF_COMPACT_ATTRIBUTES):
+            self._attr_extra_state_attributes = None
+        else:
+            self._attr_extra_state_attributes = {
+                tariff: round(value, self._rounding)
+                for tariff, value in tariffs.items()
+                if tariff != "Total"
+            }
+
+    @callback
+    @override
+    def _handle_coordinator_update(self) -> None:
+        previous = (
+            self._attr_native_value,
+            self._attr_last_reset,
+            self._attr_extra_state_attributes,
+            self._available,
+        )
+        self._update_state()
+        self._available = self.available
+        if (
+            self._attr_native_value,
+            self._attr_last_reset,
+            self._attr_extra_state_attributes,
+            self._available,
+        ) == previous:
+            return
+        self.async_write_ha_state()
+
+
+class AuroraBalanceSensor(CoordinatorEntity[AuroraPlusCoordinator], SensorEntity):
+    """One detail of the balance, as a diagnostic sensor.
+
+    These are also attributes of the estimated balance, but aren't recorded
+    there. They are disabled by default.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        sensor: str,
+        name: str,
+        coordinator: AuroraPlusCoordinator,
+        field: str,
+        unit: str | None,
+    ):
+        """Initialize the Aurora+ sensor."""
+        super().__init__(coordinator)
+        self._hass = hass
+        self._name = name + " " + coordinator.service_agreement_id + " " + sensor
+        self._sensor = sensor
+        self._coordinator = coordinator
+        self._uniqueid = self._name.replace(" ", "_").lower()
+        self._field = field
+        self._attr_native_unit_of_measurement = unit
+        if unit == CURRENCY_DOLLAR:
+            self._attr_device_class = SensorDeviceClass.MONETARY
+        self._attr_native_value = self._value()
+        self._available = coordinator.last_update_success
+        _LOGGER.debug(f"{self._sensor} created")
+
+    @property
+    @override
+    def name(self) -> str:
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    @override
+    def unique_id(self) -> str:
+        """Return the unique_id of the sensor."""
+        return self._uniqueid
+
+    def _value(self) -> float | int | None:
+        balance = self._coordinator.data.balance
+        return getattr(balance, self._field) if balance else None
+
+    @callback
+    @override
+    def _handle_coordinator_update(self) -> None:
+        value = self._value()
+        if (value, self.available) == (self._attr_native_value, self._available):
+            return
+        self._attr_native_value = value
+        self._available = self.available
+        self.async_write_ha_state()
+
+
+class AuroraBackfillSensor(SensorEntity):
+    """Progress of the latest backfill, as a percentage of the days to fetch."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        sensor: str,
+        name: str,
+        coordinator: AuroraPlusCoordinator,
+    ):
+        """Initialize the Aurora+ sensor."""
+        self._hass = hass
+        self._name = name + " " + coordinator.service_agreement_id + " " + sensor
+        self._sensor = sensor
+        self._coordinator = coordinator
+        self._uniqueid = self._name.replace(" ", "_").lower()
+        _LOGGER.debug(f"{self._sensor} created")
+
+    @property
+    @override
+    def name(self) -> str:
+        """Return the name of the sensor."""
+        return self._name
+
+    @property
+    @override
+    def unique_id(self) -> str:
+        """Return the unique_id of the sensor."""
+        return self._uniqueid
+
+    @property
+    @override
+    def native_value(self) -> float | None:
+        return self._coordinator.backfill.percentage
+
+    @property
+    @override
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self._coordinator.backfill.progress
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._coordinator.backfill.async_add_listener(self.async_write_ha_state)
+        )
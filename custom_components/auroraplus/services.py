@@ -0,0 +1,132 @@
+"""Services for the auroraplus integration."""
+
+import datetime
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMATS,
+    SERVICE_BACKFILL,
+    SERVICE_EXPORT,
+)
+from .coordinator import AuroraPlusCoordinator
+from .export import export_usage
+
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_PATH = "path"
+ATTR_FORMAT = "format"
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+    }
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_CSV): vol.In(EXPORT_FORMATS),
+    }
+)
+
+
+def _get_entry(hass: HomeAssistant, call: ServiceCall) -> ConfigEntry:
+    entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or entry.state is not ConfigEntryState.LOADED
+    ):
+        raise ServiceValidationError(
+            f"{call.data[ATTR_CONFIG_ENTRY_ID]} is not a loaded Aurora+ entry"
+        )
+    return entry
+
+
+def _get_dates(call: ServiceCall) -> tuple[datetime.date, datetime.date]:
+    start = call.data[ATTR_START_DATE]
+    end = call.data.get(
+        ATTR_END_DATE, dt_util.now().date() - datetime.timedelta(days=1)
+    )
+    if start > end:
+        raise ServiceValidationError(f"{start} is after {end}")
+    return start, end
+
+
+@callback
+def async_setup_services(hass: HomeAssistant):
+    """Register the integration's services, once for all entries.
+
+    They stay registered without entries, and refuse entries not loaded.
+    """
+
+    async def backfill(call: ServiceCall):
+        entry = _get_entry(hass, call)
+        coordinator: AuroraPlusCoordinator = entry.runtime_data
+        start, end = _get_dates(call)
+        if coordinator.backfill.running:
+            raise ServiceValidationError(
+                f"A backfill is already running for {entry.title}"
+            )
+
+        entry.async_create_background_task(
+            hass, coordinator.backfill.async_run(start, end), f"{entry.title} backfill"
+        )
+
+    async def export(call: ServiceCall) -> ServiceResponse:
+        coordinator: AuroraPlusCoordinator = _get_entry(hass, call).runtime_data
+        start, end = _get_dates(call)
+        path = call.data[ATTR_PATH]
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"Writing to {path} is not allowed")
+
+        # The dates and tariffs are taken now, the records as they're written.
+        store = coordinator.usage_store
+        dates = [d for d in store.dates() if start <= d <= end]
+        try:
+            rows = await hass.async_add_executor_job(
+                export_usage,
+                store,
+                dates,
+                list(store.tariffs),
+                path,
+                call.data[ATTR_FORMAT],
+            )
+        except ImportError as err:
+            raise HomeAssistantError(
+                f"Exporting to {call.data[ATTR_FORMAT]} needs pyarrow: {err}"
+            ) from err
+        except OSError as err:
+            raise HomeAssistantError(f"Could not write {path}: {err}") from err
+        return {"path": path, "days": len(dates), "records": rows}
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, backfill, schema=BACKFILL_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
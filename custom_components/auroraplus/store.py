@@ -0,0 +1,268 @@
+"""Persistent cache of the daily usage data fetched from Aurora+."""
+
+import datetime
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    STORAGE_RETENTION,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    USAGE_FIELDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def normalise_day(
+    day: dict[str, Any], totals: dict[str, dict[str, float]] | None = None
+) -> dict[str, Any]:
+    """Reduce a day payload from the API to what we need to keep.
+
+    Each MeteredUsageRecord becomes a [timestamp, {field: {tariff: value}}]
+    pair, without any of the empty values. The daily totals are taken from the
+    payload's SummaryTotals, unless given.
+    """
+    records = []
+    for r in day.get("MeteredUsageRecords") or []:
+        if not r or not r.get("StartTime"):
+            continue
+        values = {}
+        for field in USAGE_FIELDS:
+            tariffs = {t: float(v) for t, v in (r.get(field) or {}).items() if v}
+            if tariffs:
+                values[field] = tariffs
+        if values:
+            timestamp = datetime.datetime.fromisoformat(r["StartTime"]).timestamp()
+            records.append([timestamp, values])
+
+    if totals is None:
+        summary = day.get("SummaryTotals") or {}
+        totals = {field: summary.get(field) or {} for field in USAGE_FIELDS}
+
+    return {
+        "start_date": day.get("StartDate"),
+        "records": records,
+        "totals": totals,
+    }
+
+
+def split_days(payload: dict[str, Any]) -> dict[datetime.date, dict[str, Any]]:
+    """Split a payload covering several days, such as a week, into days.
+
+    Records are grouped by the local date of their StartTime, and each day is
+    normalised as with normalise_day. As there is no SummaryTotals per day, the
+    totals are summed from the records.
+    """
+    by_date: dict[datetime.date, list[dict[str, Any]]] = {}
+    for r in payload.get("MeteredUsageRecords") or []:
+        if not r or not r.get("StartTime"):
+            continue
+        start = datetime.datetime.fromisoformat(r["StartTime"])
+        by_date.setdefault(dt_util.as_local(start).date(), []).append(r)
+
+    days = {}
+    for date, records in by_date.items():
+        day = normalise_day(
+            {"StartDate": records[0]["StartTime"], "MeteredUsageRecords": records}, {}
+        )
+        if not day["records"]:
+            continue
+        totals: dict[str, dict[str, float]] = {}
+        for _timestamp, values in day["records"]:
+            for field, tariffs in values.items():
+                field_totals = totals.setdefault(field, {"Total": 0.0})
+                for tariff, value in tariffs.items():
+                    field_totals[tariff] = field_totals.get(tariff, 0.0) + value
+                    field_totals["Total"] += value
+        day["totals"] = totals
+        days[date] = day
+
+    return days
+
+
+def day_tariffs(day: dict[str, Any]) -> set[str]:
+    """Return the tariffs a normalised day has any records or totals for."""
+    tariffs = set()
+    for _timestamp, values in day.get("records", []):
+        for field_tariffs in values.values():
+            tariffs.update(field_tariffs)
+    for field_totals in (day.get("totals") or {}).values():
+        tariffs.update(field_totals)
+    tariffs.discard("Total")
+    return tariffs
+
+
+UsageColumns = dict[str, dict[str, tuple[tuple[float, ...], tuple[float, ...]]]]
+
+
+def usage_columns(day: dict[str, Any]) -> UsageColumns:
+    """Split a normalised day into columns, per field then per tariff.
+
+    Each column is a pair of tuples: the timestamps and the (absolute) values
+    for every record that has a value for this field and tariff.
+    """
+    columns: dict[str, dict[str, tuple[list[float], list[float]]]] = {}
+    for timestamp, values in day.get("records", []):
+        for field, tariffs in values.items():
+            for tariff, value in tariffs.items():
+                timestamps, column = columns.setdefault(field, {}).setdefault(
+                    tariff, ([], [])
+                )
+                timestamps.append(timestamp)
+                column.append(abs(value))
+
+    return {
+        field: {t: (tuple(ts), tuple(vs)) for t, (ts, vs) in tariffs.items()}
+        for field, tariffs in columns.items()
+    }
+
+
+class AuroraPlusUsageStore:
+    """Daily usage data for one service agreement, keyed by calendar date.
+
+    The data is kept under .storage, and rewritten (atomically) whenever a new
+    day is added or the account changes. Days older than STORAGE_RETENTION are
+    dropped. The publication times change after most polls, so they're saved
+    STORAGE_SAVE_DELAY later, with the next day, or on unload, rather than
+    rewriting all the days each time.
+
+    The account information needed to set up the service without talking to
+    Aurora+ is kept alongside, as are the times new data was published. The
+    account's tariffs are those found in the days added so far.
+    """
+
+    _store: Store[dict[str, Any]]
+    _days: dict[str, dict[str, Any]]
+    _listeners: list[Callable[[dict[datetime.date, dict[str, Any]]], None]]
+    _save_pending: bool
+    account: dict[str, Any]
+    publish_times: list[float]
+
+    def __init__(self, hass: HomeAssistant, service_agreement_id: str):
+        self._store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{service_agreement_id}.usage"
+        )
+        self._days = {}
+        self._listeners = []
+        self._save_pending = False
+        self.account = {}
+        self.publish_times = []
+
+    async def async_load(self):
+        data = await self._store.async_load()
+        if data:
+            self._days = data.get("days", {})
+            self.account = data.get("account", {})
+            self.publish_times = data.get("publish_times", [])
+        _LOGGER.debug(f"loaded {len(self._days)} days from {self._store.key}")
+
+    def __contains__(self, date: datetime.date) -> bool:
+        return date.isoformat() in self._days
+
+    def get_day(self, date: datetime.date) -> dict[str, Any] | None:
+        return self._days.get(date.isoformat())
+
+    def days_since(self, since: datetime.date) -> dict[datetime.date, dict[str, Any]]:
+        """Return the days held from a date on."""
+        return {
+            datetime.date.fromisoformat(d): day
+            for d, day in self._days.items()
+            if d >= since.isoformat()
+        }
+
+    @callback
+    def async_add_listener(
+        self, listener: Callable[[dict[datetime.date, dict[str, Any]]], None]
+    ) -> CALLBACK_TYPE:
+        """Call a function with the days added, each time some are."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def dates(self) -> list[datetime.date]:
+        """Return the dates held, oldest first."""
+        return [datetime.date.fromisoformat(d) for d in sorted(self._days)]
+
+    @property
+    def tariffs(self) -> list[str]:
+        return self.account.get("TariffTypes", [])
+
+    def latest_date(self) -> datetime.date | None:
+        if not self._days:
+            return None
+        return datetime.date.fromisoformat(max(self._days))
+
+    async def async_set_day(self, date: datetime.date, day: dict[str, Any]):
+        """Add or replace the data for a day, and save."""
+        await self.async_set_days({date: day})
+
+    async def async_set_days(self, days: dict[datetime.date, dict[str, Any]]):
+        """Add or replace the data for several days, and save once.
+
+        Any tariff not seen before is added to the account.
+        """
+        tariffs = set()
+        for date, day in days.items():
+            self._days[date.isoformat()] = day
+            tariffs |= day_tariffs(day)
+        if new := tariffs.difference(self.tariffs):
+            _LOGGER.info(f"new tariffs in {self._store.key}: {sorted(new)}")
+            self.account = self.account | {"TariffTypes": self.tariffs + sorted(new)}
+        self._evict()
+        for listener in self._listeners:
+            listener(days)
+        await self._async_save()
+
+    def usage_columns_since(self, since: datetime.date) -> UsageColumns:
+        """Split the days held from a date on into columns, as usage_columns.
+
+        The days are joined in chronological order.
+        """
+        records = []
+        for d in sorted(self._days):
+            if d >= since.isoformat():
+                records.extend(self._days[d].get("records", []))
+        return usage_columns({"records": records})
+
+    async def async_set_account(self, account: dict[str, Any]):
+        """Replace the account information, and save if it changed."""
+        if account == self.account:
+            return
+        self.account = account
+        await self._async_save()
+
+    async def async_set_publish_times(self, publish_times: list[float]):
+        self.publish_times = publish_times
+        self._async_delay_save()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "account": self.account,
+            "publish_times": self.publish_times,
+            "days": self._days,
+        }
+
+    async def async_flush(self):
+        """Save the changes still waiting to be, if any."""
+        if self._save_pending:
+            await self._async_save()
+
+    async def _async_save(self):
+        self._save_pending = False
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_delay_save(self):
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    def _evict(self):
+        oldest = (dt_util.now().date() - STORAGE_RETENTION).isoformat()
+        for d in [d for d in self._days if d < oldest]:
+            del self._days[d]
@@ -0,0 +1,170 @@
+"""Background refresh of the Aurora+ access token."""
+
+import base64
+import datetime
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .api import AuroraPlusAsyncApi, async_api_call, is_auth_error
+from .const import DOMAIN, TOKEN_REFRESH_MARGIN, TOKEN_RETRY_DELAY, TOKEN_SAVE_DELAY
+from .resilience import API_ERRORS
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_TOKEN_WRITER: HassKey["AuroraPlusTokenWriter"] = HassKey(f"{DOMAIN}_token_writer")
+
+
+def token_expiry(access_token: str | None) -> datetime.datetime | None:
+    """Return when a JWT access token expires, if it says."""
+    try:
+        payload = access_token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return dt_util.utc_from_timestamp(float(claims["exp"]))
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class AuroraPlusTokenManager:
+    """Refresh the access token in the background, before it expires.
+
+    The refresh is scheduled TOKEN_REFRESH_MARGIN before the expiry read from
+    the token, so data fetches don't have to refresh it first. If the token was
+    rotated in the meantime (when a call found it stale), the refresh is
+    skipped, and scheduled again from the new token. The new token is handed
+    to on_rotated, once per rotation.
+
+    Tokens that don't say when they expire are left to be refreshed when a
+    call fails.
+    """
+
+    _hass: HomeAssistant
+    _api: AuroraPlusAsyncApi
+    _on_rotated: Callable[[], Awaitable[Any]]
+    _unsub: CALLBACK_TYPE | None
+    _access_token: str | None
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: AuroraPlusAsyncApi,
+        on_rotated: Callable[[], Awaitable[Any]],
+    ):
+        self._hass = hass
+        self._api = api
+        self._on_rotated = on_rotated
+        self._unsub = None
+        self._access_token = None
+
+    @callback
+    def async_start(self):
+        self._schedule()
+
+    @callback
+    def async_stop(self):
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _schedule(self, min_delay: float = 0):
+        """Schedule the next refresh from the current token's expiry.
+
+        A token that expires too soon after it was obtained isn't refreshed
+        again straight away, but after min_delay.
+        """
+        self.async_stop()
+        self._access_token = self._api.token.get("access_token")
+        expiry = token_expiry(self._access_token)
+        if expiry is None:
+            _LOGGER.debug("access token expiry unknown; not refreshing early")
+            return
+        delay = max(
+            (expiry - TOKEN_REFRESH_MARGIN - dt_util.utcnow()).total_seconds(),
+            min_delay,
+        )
+        _LOGGER.debug(f"refreshing access token in {delay:.0f}s")
+        self._unsub = async_call_later(self._hass, delay, self._async_refresh)
+
+    async def _async_refresh(self, _now: Any = None):
+        self._unsub = None
+        try:
+            await async_api_call(
+                self._hass, self._api.refresh_token, self._access_token
+            )
+        except API_ERRORS as e:
+            if is_auth_error(e):
+                # The next update will fail too, and start reauthentication.
+                _LOGGER.warning(f"could not refresh the access token: {e}")
+                return
+            _LOGGER.warning(f"could not refresh the access token, will retry: {e}")
+            self._schedule(TOKEN_RETRY_DELAY)
+            return
+        await self._on_rotated()
+        self._schedule(TOKEN_RETRY_DELAY)
+
+
+class AuroraPlusTokenWriter:
+    """Write rotated tokens to the config entries, for all accounts at once.
+
+    Writes are queued per entry, with the latest one replacing any pending,
+    and all run together TOKEN_SAVE_DELAY after the first one was queued. The
+    config entries are then saved once for all. Pending writes also run when
+    Home Assistant stops, or for one entry when it's unloaded, so a rotated
+    refresh token isn't lost.
+    """
+
+    _hass: HomeAssistant
+    _pending: dict[str, Callable[[], None]]
+    _unsub: CALLBACK_TYPE | None
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._pending = {}
+        self._unsub = None
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_on_stop)
+
+    @callback
+    def async_schedule(self, entry_id: str, write: Callable[[], None]):
+        self._pending[entry_id] = write
+        if self._unsub is None:
+            self._unsub = async_call_later(
+                self._hass, TOKEN_SAVE_DELAY, self._async_flush_all
+            )
+
+    @callback
+    def async_flush(self, entry_id: str):
+        """Run the pending write for one entry now, if any."""
+        if (write := self._pending.pop(entry_id, None)) is not None:
+            write()
+
+    @callback
+    def _async_flush_all(self, _now: Any = None):
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        pending, self._pending = self._pending, {}
+        _LOGGER.debug(f"writing tokens for {len(pending)} entries")
+        for write in pending.values():
+            write()
+
+    @callback
+    def _async_on_stop(self, _event: Event):
+        self._async_flush_all()
+
+
+@callback
+def async_get_token_writer(hass: HomeAssistant) -> AuroraPlusTokenWriter:
+    """Return the token writer shared by all Aurora+ accounts."""
+    if DATA_TOKEN_WRITER not in hass.data:
+        hass.data[DATA_TOKEN_WRITER] = AuroraPlusTokenWriter(hass)
+    return hass.data[DATA_TOKEN_WRITER]
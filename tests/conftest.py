@@ -1,3 +1,4 @@
+from collections.abc import Generator
 from typing import Awaitable
 from unittest.mock import MagicMock, patch
 
@@ -18,9 +19,30 @@ def auto_enable_custom_integrations(enable_custom_integrations):
     return
 
 
+@pytest.fixture(autouse=True)
+def no_rate_limit():
+    """Don't rate limit the calls to a mock API."""
+    with patch("custom_components.auroraplus.limiter.RATE_LIMIT_RATE", 1000.0):
+        yield
+
+
+@pytest.fixture
+def mock_recorder(hass: HomeAssistant) -> Generator[MagicMock]:
+    """Stand in for the recorder, running its executor jobs in HA's."""
+    recorder = MagicMock()
+    recorder.async_add_executor_job.side_effect = lambda func, *args: (
+        hass.async_add_executor_job(func, *args)
+    )
+    with patch(
+        "custom_components.auroraplus.importer.get_instance", return_value=recorder
+    ):
+        yield recorder
+
+
 @pytest.fixture
 async def mock_api() -> AuroraPlusApi:
     mock_api = MagicMock()
+    mock_api.customerId = "mock_customer_id"
     mock_api.serviceAgreementID = "mock_api_id"
     mock_api.premiseAddress = "mock_address"
     mock_api.token = {
@@ -61,15 +83,20 @@ async def mock_api() -> AuroraPlusApi:
             "update_week.call_count": update_week.call_count,
         }
 
+    def update_summary(index: int = -1):
+        mock_api.DollarValueUsage = {"T140": 1.5, "Total": 1.5}
+        mock_api.KilowattHourUsage = {"T140": 5.0, "Total": 5.0}
+
     mock_api.getday = MagicMock()
     mock_api.getday.side_effect = update_day
+    mock_api.getsummary.side_effect = update_summary
     mock_api.getweek.side_effect = update_week
 
     return mock_api
 
 
 @pytest.fixture
-@patch("custom_components.auroraplus.api.AuroraPlusApi")
+@patch("custom_components.auroraplus.api.AuroraPlusAsyncApi")
 async def config_entry(
     auroraplus_api: MagicMock,
     mock_api: MagicMock,
@@ -97,12 +124,8 @@ async def build_config_entry(hass: HomeAssistant) -> Awaitable[ConfigEntry]:
             unique_id="config_entry_fixture",
         )
         config_entry.add_to_hass(hass)
-
-        assert await config_entry.setup_lock.acquire(), (
-            "Can't acquire setup lock; retry"
-        )
-        await config_entry.async_setup(hass)
-        config_entry.setup_lock.release()
+        # Sets up the integration first, then the entry.
+        await hass.config_entries.async_setup(config_entry.entry_id)
 
         return config_entry
 
@@ -0,0 +1,70 @@
+import datetime
+
+import pytest
+
+from custom_components.auroraplus.aggregates import UsageAggregates, period_start
+from custom_components.auroraplus.const import (
+    PERIOD_BILLING,
+    PERIOD_MONTH,
+    PERIOD_WEEK,
+)
+
+
+def day(kwh: dict[str, float]) -> dict:
+    return {
+        "records": [],
+        "totals": {"KilowattHourUsage": kwh | {"Total": sum(kwh.values())}},
+    }
+
+
+@pytest.mark.parametrize(
+    ("period", "date", "start"),
+    [
+        (PERIOD_WEEK, datetime.date(2025, 12, 17), datetime.date(2025, 12, 15)),
+        (PERIOD_MONTH, datetime.date(2025, 12, 17), datetime.date(2025, 12, 1)),
+        (PERIOD_BILLING, datetime.date(2025, 12, 17), datetime.date(2025, 12, 10)),
+        (PERIOD_BILLING, datetime.date(2025, 12, 3), datetime.date(2025, 11, 10)),
+        (PERIOD_BILLING, datetime.date(2026, 1, 3), datetime.date(2025, 12, 10)),
+    ],
+)
+def test_period_start(period: str, date: datetime.date, start: datetime.date):
+    assert period_start(period, date, 10) == start
+
+
+def test_aggregates():
+    aggregates = UsageAggregates(10)
+    aggregates.add_days(
+        {
+            datetime.date(2025, 12, 12): day({"T93PEAK": 1.0}),
+            datetime.date(2025, 12, 15): day({"T93PEAK": 2.0, "T93OFFPEAK": 0.5}),
+        }
+    )
+    totals, starts = aggregates.snapshot()
+    assert starts[PERIOD_WEEK] == datetime.date(2025, 12, 15)
+    assert totals[PERIOD_WEEK]["KilowattHourUsage"] == {
+        "Total": 2.5,
+        "T93PEAK": 2.0,
+        "T93OFFPEAK": 0.5,
+    }
+    assert totals[PERIOD_MONTH]["KilowattHourUsage"]["Total"] == 3.5
+    # The same snapshot until more days come in.
+    assert aggregates.snapshot()[0] is totals
+
+    # A day added again replaces what it counted before.
+    aggregates.add_days({datetime.date(2025, 12, 15): day({"T93PEAK": 3.0})})
+    totals, starts = aggregates.snapshot()
+    assert totals[PERIOD_MONTH]["KilowattHourUsage"]["Total"] == 4.0
+    assert totals[PERIOD_MONTH]["KilowattHourUsage"]["T93OFFPEAK"] == 0.0
+
+    # A new month starts over, days from before it are left out.
+    aggregates.add_days(
+        {
+            datetime.date(2026, 1, 1): day({"T93PEAK": 1.0}),
+            datetime.date(2025, 12, 31): day({"T93PEAK": 5.0}),
+        }
+    )
+    totals, starts = aggregates.snapshot()
+    assert starts[PERIOD_MONTH] == datetime.date(2026, 1, 1)
+    assert totals[PERIOD_MONTH]["KilowattHourUsage"]["Total"] == 1.0
+    assert totals[PERIOD_WEEK]["KilowattHourUsage"]["Total"] == 6.0
+    assert totals[PERIOD_BILLING]["KilowattHourUsage"]["Total"] == 10.0
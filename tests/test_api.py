@@ -0,0 +1,157 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from auroraplus import AuroraPlusAuthenticationError
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+    AiohttpClientMockResponse,
+)
+from yarl import URL
+
+from custom_components.auroraplus.api import (
+    API_URL,
+    AuroraPlusAsyncApi,
+    async_aurora_init,
+    async_get_session,
+)
+
+CURRENT_URL = f"{API_URL}/customers/current"
+DAY_URL = f"{API_URL}/usage/day"
+REFRESH_URL = f"{API_URL}/identity/refreshToken"
+
+TOKEN = {"access_token": "old", "cookie_RefreshToken": "refresh"}
+CURRENT = [
+    {
+        "CustomerID": "mock_customer_id",
+        "Premises": [
+            {
+                "ServiceAgreementStatus": "Active",
+                "ServiceAgreementID": "mock_api_id",
+                "Address": "mock_address",
+            }
+        ],
+    }
+]
+DAY = {
+    "StartDate": "2025-12-14T13:00:00Z",
+    "MeteredUsageRecords": [],
+    "SummaryTotals": {
+        "DollarValueUsage": {"T140": 1.5, "Total": 1.5},
+        "KilowattHourUsage": {"T140": 5.0, "Total": 5.0},
+    },
+}
+
+
+def responses(url: str, *items: tuple[int, object]):
+    """Answer successive requests with each status and body in turn."""
+    queue = [
+        AiohttpClientMockResponse("get", URL(url), status=status, json=body)
+        for status, body in items
+    ]
+
+    async def side_effect(method, url, data):
+        return queue.pop(0)
+
+    return side_effect
+
+
+def authorization(call: tuple) -> str:
+    _method, _url, _data, headers = call
+    return headers["Authorization"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [401, 403])
+async def test_refreshes_token_and_retries(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, status: int
+):
+    aioclient_mock.get(
+        CURRENT_URL, side_effect=responses(CURRENT_URL, (status, None), (200, CURRENT))
+    )
+    aioclient_mock.post(
+        REFRESH_URL,
+        json={"accessToken": "bearer new"},
+        cookies={"RefreshToken": "rotated"},
+    )
+    api = AuroraPlusAsyncApi(async_get_session(hass), dict(TOKEN))
+
+    await api.get_info()
+
+    assert api.serviceAgreementID == "mock_api_id"
+    # The rotated refresh token is kept for next time.
+    assert api.token == {"access_token": "new", "cookie_RefreshToken": "rotated"}
+    assert aioclient_mock.call_count == 3
+    assert authorization(aioclient_mock.mock_calls[0]) == "Bearer old"
+    assert authorization(aioclient_mock.mock_calls[2]) == "Bearer new"
+
+
+@pytest.mark.asyncio
+async def test_refresh_keeps_refresh_token_not_rotated(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+):
+    aioclient_mock.post(REFRESH_URL, json={"accessToken": "bearer new"})
+    api = AuroraPlusAsyncApi(async_get_session(hass), dict(TOKEN))
+
+    await api.refresh_token()
+
+    assert api.token == {"access_token": "new", "cookie_RefreshToken": "refresh"}
+
+
+@pytest.mark.asyncio
+async def test_auth_error_after_refresh(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+):
+    aioclient_mock.get(
+        CURRENT_URL, side_effect=responses(CURRENT_URL, (401, None), (401, None))
+    )
+    aioclient_mock.post(REFRESH_URL, json={"accessToken": "bearer new"})
+    api = AuroraPlusAsyncApi(async_get_session(hass), dict(TOKEN))
+
+    # Retried only once.
+    with pytest.raises(AuroraPlusAuthenticationError):
+        await api.get_info()
+    assert aioclient_mock.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_getsummary_reuses_day(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+):
+    aioclient_mock.get(DAY_URL, json=DAY)
+    api = AuroraPlusAsyncApi.from_account(
+        async_get_session(hass),
+        dict(TOKEN),
+        {
+            "customerId": "mock_customer_id",
+            "serviceAgreementID": "mock_api_id",
+            "premiseAddress": "mock_address",
+        },
+    )
+
+    await api.getday(-1)
+    await api.getsummary(-1)
+    assert aioclient_mock.call_count == 1
+    assert api.KilowattHourUsage == {"T140": 5.0, "Total": 5.0}
+
+    # Another day is fetched.
+    await api.getsummary(-2)
+    assert aioclient_mock.call_count == 2
+    assert aioclient_mock.mock_calls[1][1].query["index"] == "-2"
+
+
+@pytest.mark.asyncio
+async def test_aurora_init_falls_back_to_blocking_client(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+):
+    # Not what the asyncio client expects.
+    aioclient_mock.get(CURRENT_URL, json=[{"Customer": "mock_customer_id"}])
+    blocking_api = MagicMock()
+
+    with patch(
+        "custom_components.auroraplus.api.aurora_init", return_value=blocking_api
+    ) as aurora_init:
+        api = await async_aurora_init(hass, dict(TOKEN))
+
+    assert api is blocking_api
+    aurora_init.assert_called_once_with(TOKEN)
@@ -0,0 +1,111 @@
+import datetime
+from unittest.mock import MagicMock, call, patch
+
+import aiohttp
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_capture_events
+
+from custom_components.auroraplus.const import DOMAIN, EVENT_BACKFILL, SERVICE_BACKFILL
+from custom_components.auroraplus.coordinator import AuroraPlusCoordinator
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.backfill.BACKFILL_REQUEST_INTERVAL", 0)
+async def test_backfill(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    today = dt_util.now().date()
+    latest_day = mock_api.day
+    events = async_capture_events(hass, EVENT_BACKFILL)
+    mock_api.getday.reset_mock()
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_BACKFILL,
+        {
+            ATTR_CONFIG_ENTRY_ID: config_entry.entry_id,
+            "start_date": today - datetime.timedelta(days=4),
+        },
+        blocking=True,
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    # Yesterday is already in the store.
+    assert sorted(mock_api.getday.call_args_list) == [call(-4), call(-3), call(-2)]
+    for i in range(1, 5):
+        assert today - datetime.timedelta(days=i) in coordinator.usage_store
+    # The latest day is left as it was.
+    assert mock_api.day == latest_day
+
+    assert coordinator.backfill.progress["state"] == "done"
+    assert coordinator.backfill.percentage == 100.0
+    assert len(events) == 1
+    assert events[0].data["fetched"] == 3
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.backfill.BACKFILL_REQUEST_INTERVAL", 0)
+@patch("custom_components.auroraplus.api.AuroraPlusAsyncApi")
+async def test_backfill_resumes(
+    mock_auroraplus_api: MagicMock,
+    mock_api: MagicMock,
+    build_config_entry,
+    hass: HomeAssistant,
+    hass_storage: dict,
+):
+    mock_auroraplus_api.return_value = mock_api
+    today = dt_util.now().date()
+    hass_storage["auroraplus.mock_api_id.backfill"] = {
+        "version": 1,
+        "data": {
+            "start": (today - datetime.timedelta(days=3)).isoformat(),
+            "end": (today - datetime.timedelta(days=2)).isoformat(),
+        },
+    }
+
+    config_entry = await build_config_entry(mock_api)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert call(-3) in mock_api.getday.call_args_list
+    assert call(-2) in mock_api.getday.call_args_list
+    assert today - datetime.timedelta(days=3) in config_entry.runtime_data.usage_store
+    # Done, so nothing left to resume.
+    assert "auroraplus.mock_api_id.backfill" not in hass_storage
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.backfill.BACKFILL_REQUEST_INTERVAL", 0)
+@patch("custom_components.auroraplus.resilience.RETRY_ATTEMPTS", 1)
+async def test_backfill_failures(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    today = dt_util.now().date()
+    update_day = mock_api.getday.side_effect
+
+    # A day Aurora+ fails to return is counted, and the others are kept.
+    def getday(index: int = -1):
+        if index == -3:
+            raise aiohttp.ClientConnectionError("mock connection error")
+        update_day(index)
+
+    mock_api.getday.side_effect = getday
+    await coordinator.backfill.async_run(today - datetime.timedelta(days=3), today)
+    assert coordinator.backfill.progress["failed"] == 1
+    assert coordinator.backfill.progress["fetched"] == 1
+    assert today - datetime.timedelta(days=2) in coordinator.usage_store
+
+    # Anything else is a bug, and isn't hidden.
+    mock_api.getday.side_effect = KeyError("StartDate")
+    with pytest.raises(KeyError):
+        await coordinator.backfill.async_run(today - datetime.timedelta(days=3), today)
+    assert not coordinator.backfill.running
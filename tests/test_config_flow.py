@@ -0,0 +1,138 @@
+import datetime
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.config_entries import SOURCE_USER, ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType, InvalidData
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.auroraplus.const import (
+    CONF_POLLING_MODE,
+    CONF_SCAN_INTERVAL,
+    CONF_TOKEN,
+    DOMAIN,
+    POLLING_MODE_FIXED,
+    REFRESH_JITTER,
+    TOKEN_SAVE_DELAY,
+)
+
+
+@pytest.fixture
+def mock_aurora_init(mock_api: MagicMock):
+    async def aurora_init(hass: HomeAssistant, token: dict):
+        mock_api.get_info()
+        return mock_api
+
+    with patch(
+        "custom_components.auroraplus.config_flow.async_aurora_init",
+        side_effect=aurora_init,
+    ) as mock_aurora_init:
+        yield mock_aurora_init
+
+
+@pytest.mark.asyncio
+async def test_user_flow_hands_off_api(
+    hass: HomeAssistant,
+    mock_api: MagicMock,
+    mock_aurora_init: MagicMock,
+):
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_TOKEN: json.dumps(mock_api.token)}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    config_entry: ConfigEntry = result["result"]
+    assert config_entry.state is ConfigEntryState.LOADED
+    # Setup carried on with the API from the flow, and its rotated token.
+    assert config_entry.runtime_data._api is mock_api
+    assert mock_api.get_info.call_count == 1
+    assert not mock_api.getweek.called
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + datetime.timedelta(seconds=TOKEN_SAVE_DELAY)
+    )
+    assert config_entry.data[CONF_TOKEN] == mock_api.token
+
+
+@pytest.mark.asyncio
+async def test_reauth_flow_hands_off_api(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+    mock_aurora_init: MagicMock,
+):
+    # Reloading needs the integration itself set up, not just the entry.
+    assert await async_setup_component(hass, DOMAIN, {})
+    old_api = config_entry.runtime_data._api
+    old_api.token = {"access_token": "stale", "cookie_RefreshToken": "stale"}
+    new_api = MagicMock(wraps=mock_api)
+    new_api.customerId = mock_api.customerId
+    new_api.serviceAgreementID = mock_api.serviceAgreementID
+    new_api.premiseAddress = mock_api.premiseAddress
+    new_api.token = {"access_token": "new", "cookie_RefreshToken": "new"}
+
+    async def aurora_init(hass: HomeAssistant, token: dict):
+        return new_api
+
+    mock_aurora_init.side_effect = aurora_init
+
+    result = await config_entry.start_reauth_flow(hass)
+    result = await hass.config_entries.flow.async_configure(result["flow_id"], {})
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_TOKEN: json.dumps(new_api.token)}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert config_entry.runtime_data._api is new_api
+    # Unloading the old setup didn't write its stale token over the new one.
+    assert config_entry.data[CONF_TOKEN]["cookie_RefreshToken"] != "stale"
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.AuroraPlusAsyncApi")
+async def test_options_flow_scan_interval(
+    mock_auroraplus_api: MagicMock,
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    # Set up again from the saved account, with the same API.
+    mock_auroraplus_api.from_account.return_value = mock_api
+    coordinator = config_entry.runtime_data
+
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_POLLING_MODE: POLLING_MODE_FIXED, CONF_SCAN_INTERVAL: 30},
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert config_entry.options[CONF_SCAN_INTERVAL] == 30
+    # The entry was reloaded, and polls at the new interval.
+    assert config_entry.state is ConfigEntryState.LOADED
+    assert config_entry.runtime_data is not coordinator
+    interval = config_entry.runtime_data.update_interval
+    assert (
+        datetime.timedelta(minutes=30)
+        <= interval
+        <= datetime.timedelta(minutes=30, seconds=REFRESH_JITTER)
+    )
+
+    # Shorter intervals aren't allowed.
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    with pytest.raises(InvalidData):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"], {CONF_SCAN_INTERVAL: 1}
+        )
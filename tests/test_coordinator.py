@@ -1,15 +1,27 @@
+import asyncio
+import dataclasses
+import datetime
 import logging
 from typing import Awaitable
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
+from auroraplus import AuroraPlusAuthenticationError
 from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import CONF_TOKEN
 import pytest
 from homeassistant.core import HomeAssistant
 from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
-from custom_components.auroraplus.const import DOMAIN
+from custom_components.auroraplus.const import (
+    ADAPTIVE_MAX_INTERVAL,
+    DOMAIN,
+    REFRESH_JITTER,
+    TOKEN_SAVE_DELAY,
+)
 from custom_components.auroraplus.coordinator import AuroraPlusCoordinator
+from custom_components.auroraplus.resilience import CircuitBreaker
 
 
 async def test_async_setup(hass: HomeAssistant):
@@ -18,7 +30,7 @@ async def test_async_setup(hass: HomeAssistant):
 
 
 @pytest.mark.asyncio
-@patch("custom_components.auroraplus.api.AuroraPlusApi")
+@patch("custom_components.auroraplus.api.AuroraPlusAsyncApi")
 async def test_setup(
     mock_auroraplus_api: MagicMock,
     mock_api: MagicMock,
@@ -43,12 +55,48 @@ async def test_setup(
     )
     coordinator: AuroraPlusCoordinator = config_entry.runtime_data
 
-    assert coordinator.day
+    assert coordinator.data.usage_date
 
     assert mock_api.get_info.called
     assert mock_api.getcurrent.called
 
 
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.AuroraPlusAsyncApi")
+async def test_setup_from_saved_account(
+    mock_auroraplus_api: MagicMock,
+    mock_api: MagicMock,
+    build_config_entry: Awaitable[ConfigEntry],
+    hass: HomeAssistant,
+    hass_storage: dict,
+):
+    mock_auroraplus_api.from_account.return_value = mock_api
+    hass_storage["auroraplus.mock_api_id.usage"] = {
+        "version": 1,
+        "data": {
+            "account": {
+                "customerId": "mock_customer_id",
+                "serviceAgreementID": "mock_api_id",
+                "premiseAddress": "mock_address",
+                "TariffTypes": ["T140"],
+            },
+            "days": {},
+        },
+    }
+
+    config_entry = await build_config_entry(mock_api)
+
+    # Set up without calling Aurora+ first.
+    assert config_entry.state == ConfigEntryState.LOADED
+    assert not mock_api.get_info.called
+
+    # Data is fetched in the background.
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_api.getcurrent.called
+    # Tariffs come from the usage data, not from a week.
+    assert not mock_api.getweek.called
+
+
 @pytest.mark.asyncio
 async def test_update(
     mock_api: MagicMock,
@@ -89,11 +137,8 @@ async def test_update(
         config_entry, coordinator, "prior to update", False
     )
 
-    # Re-arm throttle, so the update applies.
-    coordinator._throttle = {}
-
     with caplog.at_level(logging.DEBUG):
-        await coordinator.async_update()
+        await coordinator.async_refresh()
         # XXX: Does caplog work in async?
         # assert "token updated in config_entry:" in caplog.text
 
@@ -101,9 +146,289 @@ async def test_update(
     assert mock_api.getday.called
     assert mock_api.getsummary.called
 
+    # Tokens for all entries are written together, a little later.
+    compare_tokens(config_entry, coordinator, "before writing", False)
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + datetime.timedelta(seconds=TOKEN_SAVE_DELAY)
+    )
+    await hass.async_block_till_done()
+
     new_entry_token, new_api_token = compare_tokens(
         config_entry, coordinator, "after update", True
     )
 
     assert new_api_token != old_api_token, "API token not updated"
     assert new_entry_token != old_entry_token, "ConfigEntry token not updated"
+
+
+@pytest.mark.asyncio
+async def test_update_single_flight(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    mock_api.getcurrent.reset_mock()
+
+    # Concurrent callers share the fetch already in flight.
+    await asyncio.gather(
+        coordinator._async_update_data(),
+        coordinator._async_update_data(),
+        coordinator._async_update_data(),
+    )
+
+    assert mock_api.getcurrent.call_count == 1
+
+
+def overlapping(func, started: asyncio.Event, other: asyncio.Event):
+    """Make an API call that only goes ahead once the other one has started."""
+
+    async def call(*args):
+        started.set()
+        await asyncio.wait_for(other.wait(), 1)
+        return func(*args)
+
+    return call
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.resilience.RETRY_ATTEMPTS", 1)
+async def test_update_calls_overlap(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    coordinator._last_day_date = dt_util.now().date() - datetime.timedelta(days=2)
+    current_started, day_started = asyncio.Event(), asyncio.Event()
+    getcurrent, getday = mock_api.getcurrent, mock_api.getday
+    getcurrent.reset_mock()
+    getday.reset_mock()
+    mock_api.getcurrent = overlapping(getcurrent, current_started, day_started)
+    mock_api.getday = overlapping(getday, day_started, current_started)
+
+    # getcurrent and the day probes run at the same time.
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert getcurrent.call_count == 1
+    assert getday.call_args_list == [call(-1)]
+
+
+@pytest.mark.asyncio
+async def test_update_retries_after_token_rotated(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    rotated = {"access_token": "rotated", "cookie_RefreshToken": "rotated"}
+
+    def getcurrent():
+        if mock_api.getcurrent.call_count == 1:
+            # Another call rotated the token while this one was in flight.
+            mock_api.token = dict(rotated)
+            raise AuroraPlusAuthenticationError()
+
+    mock_api.getcurrent.reset_mock()
+    mock_api.getcurrent.side_effect = getcurrent
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert mock_api.getcurrent.call_count == 2
+    assert mock_api.token == rotated
+
+    # Without a new token, the failure stands.
+    mock_api.getcurrent.reset_mock()
+    mock_api.getcurrent.side_effect = AuroraPlusAuthenticationError()
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert mock_api.getcurrent.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_update_half_open_circuit(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    coordinator._last_day_date = dt_util.now().date() - datetime.timedelta(days=2)
+    # Aurora+ was failing, and it's time to try again.
+    coordinator._breaker.state = CircuitBreaker.OPEN
+    coordinator._breaker._open_until = 0.0
+    getcurrent = mock_api.getcurrent
+
+    async def slow_getcurrent():
+        await asyncio.sleep(0.01)
+        return getcurrent()
+
+    mock_api.getcurrent = slow_getcurrent
+    mock_api.getday.reset_mock()
+
+    await coordinator.async_refresh()
+
+    # The probe went first, and the day probes followed once it worked.
+    assert coordinator.last_update_success
+    assert coordinator._breaker.state == CircuitBreaker.CLOSED
+    assert mock_api.getday.call_args_list == [call(-1)]
+
+
+@pytest.mark.asyncio
+async def test_update_publishes_snapshot(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    mock_api.EstimatedBalance = "12.30"
+    mock_api.AmountOwed = "0.00"
+    mock_api.UsageDaysRemaining = 7
+    before = coordinator.data
+
+    await coordinator.async_refresh()
+
+    data = coordinator.data
+    assert data is not before
+    assert data.balance.estimated_balance == 12.3
+    assert data.balance.amount_owed == 0.0
+    assert data.balance.usage_days_remaining == 7
+    assert data.totals["KilowattHourUsage"]["Total"] == 5.0
+    assert data.tariffs == ("T140",)
+
+    # Snapshots don't change once published.
+    mock_api.EstimatedBalance = "1.00"
+    assert data.balance.estimated_balance == 12.3
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        data.balance = None
+    with pytest.raises(TypeError):
+        data.totals["KilowattHourUsage"]["Total"] = 0.0
+
+
+@pytest.mark.asyncio
+async def test_update_unchanged_not_pushed(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    await coordinator.async_refresh()
+    data = coordinator.data
+    listener = MagicMock()
+    unsub = coordinator.async_add_listener(listener)
+
+    # Nothing new: the same snapshot, and no entity updates.
+    await coordinator.async_refresh()
+    assert coordinator.data is data
+    assert not listener.called
+
+    # Only the balance changed: the usage columns are kept as they were.
+    mock_api.EstimatedBalance = "5.00"
+    await coordinator.async_refresh()
+    assert coordinator.data is not data
+    assert coordinator.data.usage is data.usage
+    assert listener.call_count == 1
+    unsub()
+
+
+@pytest.mark.asyncio
+async def test_update_probes_from_last_day(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    mock_api.getday.reset_mock()
+
+    # Data for yesterday is already there, nothing newer to look for.
+    await coordinator.async_refresh()
+    assert not mock_api.getday.called
+
+    # Only days newer than the last one with data get probed.
+    update_day = mock_api.getday.side_effect
+
+    def getday(index: int = -1):
+        update_day(index)
+        mock_api.day["MeteredUsageRecords"] = [
+            {
+                "StartTime": "2025-12-14T13:00:00Z",
+                "KilowattHourUsage": {"T140": 1.0},
+            }
+        ]
+
+    mock_api.getday.side_effect = getday
+    today = dt_util.now().date()
+    coordinator._last_day_date = today - datetime.timedelta(days=3)
+    await coordinator.async_refresh()
+    assert mock_api.getday.call_args_list == [call(-2), call(-1)]
+    mock_api.getsummary.assert_called_with(-1)
+    # The day probed on the way is kept too.
+    assert today - datetime.timedelta(days=2) in coordinator.usage_store
+
+
+@pytest.mark.asyncio
+async def test_update_catches_up_by_week(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    today = dt_util.now().date()
+
+    def record(days_ago: int) -> dict:
+        start = dt_util.start_of_local_day(today - datetime.timedelta(days=days_ago))
+        return {
+            "StartTime": dt_util.as_utc(start).isoformat(),
+            "KilowattHourUsage": {"T140": 1.0},
+        }
+
+    def update_week(index: int = -1):
+        mock_api.week = {
+            "TariffTypes": ["T140"],
+            "MeteredUsageRecords": [record(i) for i in range(7, 1, -1)],
+        }
+
+    mock_api.getweek.side_effect = update_week
+    mock_api.getweek.reset_mock()
+    mock_api.getday.reset_mock()
+    coordinator._last_day_date = today - datetime.timedelta(days=6)
+
+    await coordinator.async_refresh()
+
+    # One week covers the days missed, only the day after it gets probed.
+    mock_api.getweek.assert_called_once_with(-1)
+    assert mock_api.getday.call_args_list == [call(-1)]
+    for i in range(1, 6):
+        assert today - datetime.timedelta(days=i) in coordinator.usage_store
+    # Sensors get all the new days at once.
+    _timestamps, values = coordinator.data.usage_columns("KilowattHourUsage", "T140")
+    assert values == (1.0,) * 4
+
+
+@pytest.mark.asyncio
+async def test_update_learns_publish_time(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+
+    # Nothing new: the next new data can be timed.
+    await coordinator.async_refresh()
+    assert not coordinator.usage_store.publish_times
+
+    coordinator._last_day_date = dt_util.now().date() - datetime.timedelta(days=2)
+    await coordinator.async_refresh()
+
+    assert len(coordinator.usage_store.publish_times) == 1
+    # Today's data is in, so wait as long as allowed for tomorrow's.
+    assert (
+        ADAPTIVE_MAX_INTERVAL
+        <= coordinator.update_interval
+        <= ADAPTIVE_MAX_INTERVAL + datetime.timedelta(seconds=REFRESH_JITTER)
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_written_on_unload(
+    mock_api: MagicMock,
+    config_entry: ConfigEntry,
+    hass: HomeAssistant,
+):
+    await config_entry.runtime_data.async_refresh()
+    assert config_entry.data[CONF_TOKEN] != mock_api.token
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert config_entry.data[CONF_TOKEN] == mock_api.token
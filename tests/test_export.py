@@ -0,0 +1,162 @@
+import csv
+import datetime
+from pathlib import Path
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.auroraplus.const import (
+    DOMAIN,
+    EXPORT_FORMAT_PARQUET,
+    SERVICE_EXPORT,
+)
+from custom_components.auroraplus.coordinator import AuroraPlusCoordinator
+from custom_components.auroraplus.store import normalise_day
+
+DAY = {
+    "StartDate": "2025-12-14T13:00:00Z",
+    "MeteredUsageRecords": [
+        {
+            "StartTime": "2025-12-14T13:00:00Z",
+            "KilowattHourUsage": {"T93PEAK": 0.5},
+        },
+        {
+            "StartTime": "2025-12-14T14:00:00Z",
+            "KilowattHourUsage": {"T93PEAK": 0.0, "T93OFFPEAK": 0.25},
+            "DollarValueUsage": {"T93OFFPEAK": 1.2},
+        },
+    ],
+}
+
+
+@pytest.mark.asyncio
+async def test_export_csv(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    tmp_path: Path,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    date = datetime.date(2025, 12, 15)
+    await coordinator.usage_store.async_set_day(date, normalise_day(DAY))
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    path = tmp_path / "usage.csv"
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT,
+        {
+            ATTR_CONFIG_ENTRY_ID: config_entry.entry_id,
+            "start_date": date,
+            "end_date": date,
+            "path": str(path),
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {"path": str(path), "days": 1, "records": 2}
+    rows = list(csv.DictReader(path.read_text().splitlines()))
+    assert len(rows) == 2
+    assert datetime.datetime.fromisoformat(rows[0]["start_time"]) == (
+        datetime.datetime(2025, 12, 14, 13, tzinfo=datetime.UTC)
+    )
+    assert rows[0]["KilowattHourUsage_T93PEAK"] == "0.5"
+    assert rows[0]["KilowattHourUsage_T93OFFPEAK"] == ""
+    assert rows[1]["KilowattHourUsage_T93OFFPEAK"] == "0.25"
+    # Zeros aren't kept, and are blank like missing values.
+    assert rows[1]["KilowattHourUsage_T93PEAK"] == ""
+    assert rows[1]["DollarValueUsage_T93OFFPEAK"] == "1.2"
+
+
+@pytest.mark.asyncio
+async def test_export_parquet(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    tmp_path: Path,
+):
+    pq = pytest.importorskip("pyarrow.parquet")
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    date = datetime.date(2025, 12, 15)
+    await coordinator.usage_store.async_set_day(date, normalise_day(DAY))
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+    path = tmp_path / "usage.parquet"
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT,
+        {
+            ATTR_CONFIG_ENTRY_ID: config_entry.entry_id,
+            "start_date": date,
+            "end_date": date,
+            "path": str(path),
+            "format": EXPORT_FORMAT_PARQUET,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {"path": str(path), "days": 1, "records": 2}
+    table = pq.read_table(path)
+    # Parquet has no second timestamps, they come back in milliseconds.
+    assert table.schema.field("start_time").type.tz == "UTC"
+    assert str(table.schema.field("KilowattHourUsage_T93PEAK").type) == "double"
+    columns = table.to_pydict()
+    # The local times are written as the same instants in UTC.
+    assert columns["start_time"] == [
+        datetime.datetime(2025, 12, 14, 13, tzinfo=datetime.UTC),
+        datetime.datetime(2025, 12, 14, 14, tzinfo=datetime.UTC),
+    ]
+    assert columns["KilowattHourUsage_T93PEAK"] == [0.5, None]
+    assert columns["KilowattHourUsage_T93OFFPEAK"] == [None, 0.25]
+    assert columns["DollarValueUsage_T93PEAK"] == [None, None]
+    assert columns["DollarValueUsage_T93OFFPEAK"] == [None, 1.2]
+
+
+@pytest.mark.asyncio
+async def test_export_path_not_allowed(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    tmp_path: Path,
+):
+    hass.config.allowlist_external_dirs = set()
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT,
+            {
+                ATTR_CONFIG_ENTRY_ID: config_entry.entry_id,
+                "start_date": datetime.date(2025, 12, 15),
+                "path": str(tmp_path / "usage.csv"),
+            },
+            blocking=True,
+            return_response=True,
+        )
+    assert not (tmp_path / "usage.csv").exists()
+
+
+@pytest.mark.asyncio
+async def test_services_outlive_entries(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+):
+    # Registered once for the integration, not for each entry.
+    assert hass.services.has_service(DOMAIN, SERVICE_EXPORT)
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    assert hass.services.has_service(DOMAIN, SERVICE_EXPORT)
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT,
+            {
+                ATTR_CONFIG_ENTRY_ID: config_entry.entry_id,
+                "start_date": datetime.date(2025, 12, 15),
+                "path": "/tmp/usage.csv",
+            },
+            blocking=True,
+            return_response=True,
+        )
@@ -0,0 +1,325 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.components.recorder.models import (
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant_historical_sensor import HistoricalState
+
+from custom_components.auroraplus.const import IMPORT_MAX_ATTEMPTS
+from custom_components.auroraplus.importer import (
+    ImportStatisticsBatchTask,
+    LastStatistics,
+    async_get_importer,
+)
+
+
+def metadata(statistic_id: str) -> StatisticMetaData:
+    return StatisticMetaData(
+        has_sum=True,
+        mean_type=StatisticMeanType.NONE,
+        name=None,
+        source="sensor",
+        statistic_id=statistic_id,
+        unit_class="energy",
+        unit_of_measurement="kWh",
+    )
+
+
+@pytest.mark.asyncio
+async def test_importer_batches_series(hass: HomeAssistant, mock_recorder: MagicMock):
+    hour = 3600.0
+    start = 1765717200.0
+    states = [HistoricalState(state=1.0, timestamp=start + i * hour) for i in range(3)]
+
+    last_statistics = {
+        "sensor:one": {"sensor:one": [{"start": start, "sum": 1.0}]},
+    }
+
+    importer = async_get_importer(hass)
+    assert async_get_importer(hass) is importer
+
+    with (
+        patch(
+            "custom_components.auroraplus.importer.get_last_statistics",
+            side_effect=lambda hass, n, statistic_id, *args: last_statistics.get(
+                statistic_id, {}
+            ),
+        ) as get_last_statistics,
+    ):
+        importer.async_queue(metadata("sensor:one"), states)
+        importer.async_queue(metadata("sensor:two"), states)
+        await importer._async_flush()
+
+    # One recorder job to read, one to write, for both series.
+    mock_recorder.async_add_executor_job.assert_called_once()
+    assert get_last_statistics.call_count == 2
+    mock_recorder.queue_task.assert_called_once()
+    task = mock_recorder.queue_task.call_args.args[0]
+    assert isinstance(task, ImportStatisticsBatchTask)
+    sums = {m["statistic_id"]: [s["sum"] for s in stats] for m, stats in task.batch}
+    assert sums == {"sensor:one": [2.0, 3.0], "sensor:two": [1.0, 2.0, 3.0]}
+
+
+@pytest.mark.asyncio
+async def test_last_statistics(hass: HomeAssistant, mock_recorder: MagicMock):
+    hour = 3600.0
+    start = 1765717200.0
+    states = [HistoricalState(state=1.0, timestamp=start + i * hour) for i in range(3)]
+
+    last_statistics = LastStatistics(hass)
+    importer = async_get_importer(hass)
+
+    with (
+        patch(
+            "custom_components.auroraplus.importer.get_last_statistics",
+            return_value={"sensor:one": [{"start": start, "sum": 1.0}]},
+        ) as get_last_statistics,
+    ):
+        # Read the first time only.
+        assert (await last_statistics.async_get("sensor:one"))["sum"] == 1.0
+        assert (await last_statistics.async_get("sensor:one"))["sum"] == 1.0
+        assert get_last_statistics.call_count == 1
+
+        # Then carried on from the rows written.
+        importer.async_queue(metadata("sensor:one"), states, last_statistics)
+        await importer._async_flush()
+        more = [HistoricalState(state=2.0, timestamp=start + 3 * hour)]
+        importer.async_queue(metadata("sensor:one"), more, last_statistics)
+        await importer._async_flush()
+
+    assert get_last_statistics.call_count == 1
+    assert last_statistics.get("sensor:one") == {
+        "start": start + 3 * hour,
+        "state": 2.0,
+        "sum": 5.0,
+    }
+    sums = [
+        [s["sum"] for _, stats in call.args[0].batch for s in stats]
+        for call in mock_recorder.queue_task.call_args_list
+    ]
+    assert sums == [[2.0, 3.0], [5.0]]
+
+
+@pytest.mark.asyncio
+async def test_import_since_rebases_later_rows(
+    hass: HomeAssistant, mock_recorder: MagicMock
+):
+    hour = 3600.0
+    start = 1765717200.0
+    previous = {"start": start - hour, "state": 1.0, "sum": 10.0}
+    # Hours 1 and 2 are missing, and hour 5 isn't in the usage store.
+    existing = [
+        {"start": start, "state": 1.0, "sum": 11.0},
+        {"start": start + 3 * hour, "state": 2.0, "sum": 13.0},
+        {"start": start + 5 * hour, "state": 1.0, "sum": 14.0},
+    ]
+    states = [
+        HistoricalState(state=state, timestamp=start + i * hour)
+        for i, state in enumerate([1.0, 1.0, 1.0, 2.0])
+    ]
+
+    def statistics_during_period(hass, start_time, end_time, statistic_ids, *args):
+        if end_time is None:
+            return {"sensor:one": existing}
+        return {"sensor:one": [previous]}
+
+    with (
+        patch(
+            "custom_components.auroraplus.importer.statistics_during_period",
+            side_effect=statistics_during_period,
+        ),
+    ):
+        rows = await async_get_importer(hass).async_import_since(
+            metadata("sensor:one"),
+            states,
+            datetime.datetime.fromtimestamp(start, datetime.UTC),
+        )
+
+    assert rows == 5
+    task = mock_recorder.queue_task.call_args.args[0]
+    [(_metadata, statistics)] = task.batch
+    assert [(s["start"].timestamp(), s["state"], s["sum"]) for s in statistics] == [
+        (start, 1.0, 11.0),
+        (start + hour, 1.0, 12.0),
+        (start + 2 * hour, 1.0, 13.0),
+        (start + 3 * hour, 2.0, 15.0),
+        # Rebased, keeping what it added to the sum.
+        (start + 5 * hour, 1.0, 16.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_since_reads_little_before_start(
+    hass: HomeAssistant, mock_recorder: MagicMock
+):
+    hour = 3600.0
+    start = datetime.datetime(2025, 12, 15, tzinfo=datetime.UTC)
+    # Three days of gap before start.
+    previous = {"start": start.timestamp() - 72 * hour, "state": 1.0, "sum": 10.0}
+    existing = [{"start": start.timestamp() + hour, "state": 1.0, "sum": 11.0}]
+    states = [HistoricalState(state=2.0, timestamp=start.timestamp())]
+
+    windows = []
+
+    def statistics_during_period(hass, start_time, end_time, statistic_ids, *args):
+        if end_time is None:
+            return {"sensor:one": existing}
+        windows.append(end_time - start_time)
+        if start_time.timestamp() <= previous["start"]:
+            return {"sensor:one": [previous]}
+        return {}
+
+    with (
+        patch(
+            "custom_components.auroraplus.importer.statistics_during_period",
+            side_effect=statistics_during_period,
+        ),
+        patch(
+            "custom_components.auroraplus.importer.get_last_statistics",
+            return_value={"sensor:one": [previous]},
+        ) as get_last_statistics,
+    ):
+        importer = async_get_importer(hass)
+        await importer.async_import_since(metadata("sensor:one"), states, start)
+        # Only as far back as needed to find the previous statistic.
+        assert windows == [datetime.timedelta(days=1), datetime.timedelta(days=8)]
+        assert not get_last_statistics.called
+        sums = [
+            s["sum"] for s in mock_recorder.queue_task.call_args.args[0].batch[0][1]
+        ]
+        assert sums == [12.0, 13.0]
+
+        # Nothing from start on: the latest statistic is the previous one.
+        existing = []
+        windows.clear()
+        await importer.async_import_since(metadata("sensor:one"), states, start)
+        assert windows == []
+        assert get_last_statistics.call_count == 1
+        sums = [
+            s["sum"] for s in mock_recorder.queue_task.call_args.args[0].batch[0][1]
+        ]
+        assert sums == [12.0]
+
+
+@pytest.mark.asyncio
+async def test_importer_merges_queued_states(
+    hass: HomeAssistant, mock_recorder: MagicMock
+):
+    hour = 3600.0
+    start = 1765717200.0
+
+    importer = async_get_importer(hass)
+
+    with (
+        patch(
+            "custom_components.auroraplus.importer.get_last_statistics",
+            return_value={},
+        ),
+    ):
+        # Two parts of a day, overlapping by an hour, before the flush.
+        importer.async_queue(
+            metadata("sensor:one"),
+            [HistoricalState(state=1.0, timestamp=start + i * hour) for i in range(2)],
+        )
+        importer.async_queue(
+            metadata("sensor:one"),
+            [
+                HistoricalState(state=2.0, timestamp=start + i * hour)
+                for i in range(1, 3)
+            ],
+        )
+        await importer._async_flush()
+
+    [(_metadata, statistics)] = mock_recorder.queue_task.call_args.args[0].batch
+    assert [(s["state"], s["sum"]) for s in statistics] == [
+        (1.0, 1.0),
+        (2.0, 3.0),
+        (2.0, 5.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_importer_validates_statistics(
+    hass: HomeAssistant, mock_recorder: MagicMock
+):
+    hour = 3600.0
+    start = 1765717200.0
+    importer = async_get_importer(hass)
+
+    # Metadata the recorder's API would refuse is refused straight away.
+    for invalid in (
+        metadata("sensor_one"),
+        metadata("sensor:one") | {"source": "auroraplus"},
+        {k: v for k, v in metadata("sensor:one").items() if k != "unit_class"},
+    ):
+        with pytest.raises(ValueError):
+            importer.async_queue(invalid, [])
+        with pytest.raises(ValueError):
+            await importer.async_import_since(
+                invalid, [], datetime.datetime.fromtimestamp(start, datetime.UTC)
+            )
+
+    # A series with a statistic off the hour is left out of the batch.
+    with patch(
+        "custom_components.auroraplus.importer.get_last_statistics",
+        return_value={},
+    ):
+        importer.async_queue(
+            metadata("sensor:one"),
+            [HistoricalState(state=1.0, timestamp=start + hour / 2)],
+        )
+        importer.async_queue(
+            metadata("sensor:two"), [HistoricalState(state=1.0, timestamp=start)]
+        )
+        await importer._async_flush()
+
+    [(batch_metadata, _statistics)] = mock_recorder.queue_task.call_args.args[0].batch
+    assert batch_metadata["statistic_id"] == "sensor:two"
+
+
+def test_batch_task_retries_capped():
+    instance = MagicMock()
+    task = ImportStatisticsBatchTask([(metadata("sensor:one"), [])])
+
+    with patch(
+        "custom_components.auroraplus.importer.import_statistics", return_value=False
+    ) as import_statistics:
+        task.run(instance)
+        for _ in range(IMPORT_MAX_ATTEMPTS - 1):
+            instance.queue_task.call_args.args[0].run(instance)
+
+    # Given up on after the last attempt.
+    assert import_statistics.call_count == IMPORT_MAX_ATTEMPTS
+    assert instance.queue_task.call_count == IMPORT_MAX_ATTEMPTS - 1
+
+
+@pytest.mark.asyncio
+async def test_latest_statistics_read_once(
+    hass: HomeAssistant, mock_recorder: MagicMock
+):
+    hour = 3600.0
+    start = 1765717200.0
+    last_statistics = LastStatistics(hass)
+    importer = async_get_importer(hass)
+
+    with patch(
+        "custom_components.auroraplus.importer.get_latest_statistics",
+        return_value={},
+    ) as get_latest_statistics:
+        for i in range(2):
+            state = HistoricalState(state=1.0, timestamp=start + i * hour)
+            for statistic_id in ("sensor:one", "sensor:two"):
+                importer.async_queue(metadata(statistic_id), [state], last_statistics)
+            await importer._async_flush()
+
+    # Both series read in the first flush, and neither in the second.
+    get_latest_statistics.assert_called_once()
+    assert sorted(get_latest_statistics.call_args.args[1]) == [
+        "sensor:one",
+        "sensor:two",
+    ]
+    assert mock_recorder.queue_task.call_count == 2
@@ -0,0 +1,49 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.auroraplus.limiter import (
+    AuroraPlusRateLimiter,
+    async_get_limiter,
+)
+
+
+async def test_limiter_shared(hass: HomeAssistant):
+    assert async_get_limiter(hass) is async_get_limiter(hass)
+
+
+@patch("custom_components.auroraplus.limiter.asyncio.sleep", new_callable=AsyncMock)
+async def test_limiter_rate(sleep: AsyncMock):
+    limiter = AuroraPlusRateLimiter(rate=0.5, burst=2, concurrency=4)
+
+    # The burst goes straight through, then calls are spaced out.
+    for _ in range(2):
+        async with limiter:
+            pass
+    assert not sleep.called
+
+    sleep.side_effect = lambda delay: setattr(
+        limiter, "_tokens", limiter._tokens + delay * 0.5
+    )
+    async with limiter:
+        pass
+    assert sleep.await_args.args[0] == pytest.approx(2.0, abs=0.01)
+
+
+async def test_limiter_concurrency():
+    limiter = AuroraPlusRateLimiter(rate=100, burst=10, concurrency=2)
+    in_flight = 0
+    most_in_flight = 0
+
+    async def call():
+        nonlocal in_flight, most_in_flight
+        async with limiter:
+            in_flight += 1
+            most_in_flight = max(most_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+
+    await asyncio.gather(*(call() for _ in range(5)))
+    assert most_in_flight == 2
@@ -0,0 +1,197 @@
+import datetime
+from unittest.mock import MagicMock, call, patch
+
+import aiohttp
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.auroraplus.coordinator import AuroraPlusCoordinator
+from custom_components.auroraplus.repair import find_gap_days
+
+
+def hours(date: datetime.date, count: int = 3) -> list[float]:
+    start = dt_util.start_of_local_day(date).timestamp()
+    return [start + 3600 * i for i in range(count)]
+
+
+def day(date: datetime.date) -> dict:
+    return {
+        "records": [
+            [timestamp, {"KilowattHourUsage": {"T140": 1.0}}]
+            for timestamp in hours(date)
+        ],
+        "totals": {"KilowattHourUsage": {"T140": 3.0, "Total": 3.0}},
+    }
+
+
+def test_find_gap_days():
+    date = datetime.date(2025, 12, 15)
+    timestamps = hours(date) + hours(date + datetime.timedelta(days=1))
+
+    assert find_gap_days(timestamps, set(timestamps)) == []
+    assert find_gap_days(timestamps, set(hours(date))) == [
+        date + datetime.timedelta(days=1)
+    ]
+    # A single hour missing is enough.
+    assert find_gap_days(timestamps, set(timestamps[1:])) == [date]
+
+
+@pytest.mark.asyncio
+async def test_repair(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    today = dt_util.now().date()
+    first = today - datetime.timedelta(days=4)
+    last = today - datetime.timedelta(days=2)
+    # The T140 sensors are added with the new tariff.
+    await coordinator.usage_store.async_set_days({first: day(first), last: day(last)})
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    mock_api.getday.reset_mock()
+
+    covered = set(hours(first))
+    with (
+        patch(
+            "custom_components.auroraplus.importer."
+            "AuroraPlusStatisticsImporter.async_get_covered_hours",
+            side_effect=lambda statistic_ids, start: dict.fromkeys(
+                statistic_ids, covered
+            ),
+        ) as get_covered_hours,
+        patch(
+            "custom_components.auroraplus.importer."
+            "AuroraPlusStatisticsImporter.async_import_since",
+            return_value=3,
+        ) as async_import_since,
+    ):
+        await coordinator.repair.async_check()
+
+        # The day missing from the store is refetched.
+        assert mock_api.getday.call_args_list == [call(-3)]
+        assert today - datetime.timedelta(days=3) in coordinator.usage_store
+        statistic_ids, start = get_covered_hours.call_args.args
+        assert start == dt_util.start_of_local_day(first)
+        # Only the statistic with a gap, from the first day with one on.
+        async_import_since.assert_called_once()
+        metadata, states, start, _last_statistics = async_import_since.call_args.args
+        assert (
+            metadata["statistic_id"]
+            == "sensor:auroraplus_mock_api_id_kilowatt_hour_usage_tariff_t140"
+        )
+        assert [state.timestamp for state in states] == hours(last)
+        assert start == dt_util.start_of_local_day(last)
+        assert coordinator.repair.result == {
+            "checked": len(statistic_ids),
+            "refetched": 1,
+            "repaired": {metadata["statistic_id"]: 3},
+        }
+
+        # Nothing to do once the statistics are complete.
+        covered |= set(hours(last))
+        async_import_since.reset_mock()
+        mock_api.getday.reset_mock()
+        await coordinator.repair.async_check()
+        assert not mock_api.getday.called
+        assert not async_import_since.called
+
+
+@pytest.mark.asyncio
+async def test_repair_rebases_sums(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_recorder: MagicMock,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    today = dt_util.now().date()
+    first = today - datetime.timedelta(days=3)
+    last = today - datetime.timedelta(days=2)
+    await coordinator.usage_store.async_set_days({first: day(first), last: day(last)})
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    statistic_id = "sensor:auroraplus_mock_api_id_kilowatt_hour_usage_tariff_t140"
+    # The first hour of the last day is missing, and a later hour was imported
+    # before the days were cached.
+    h = hours(last, 6)
+    table = {
+        statistic_id: [
+            {"start": timestamp, "state": 1.0, "sum": float(i + 1)}
+            for i, timestamp in enumerate(hours(first))
+        ]
+        + [
+            {"start": h[1], "state": 1.0, "sum": 4.0},
+            {"start": h[2], "state": 1.0, "sum": 5.0},
+            {"start": h[5], "state": 2.0, "sum": 7.0},
+        ]
+    }
+
+    def statistics_during_period(hass, start_time, end_time, statistic_ids, *args):
+        return {
+            statistic_id: [
+                row
+                for row in table.get(statistic_id, [])
+                if row["start"] >= start_time.timestamp()
+                and (end_time is None or row["start"] < end_time.timestamp())
+            ]
+            for statistic_id in statistic_ids
+        }
+
+    with patch(
+        "custom_components.auroraplus.importer.statistics_during_period",
+        side_effect=statistics_during_period,
+    ):
+        await coordinator.repair.async_check()
+
+    assert coordinator.repair.result["repaired"] == {statistic_id: 4}
+    task = mock_recorder.queue_task.call_args.args[0]
+    [(metadata, statistics)] = task.batch
+    assert metadata["statistic_id"] == statistic_id
+    assert [(s["start"].timestamp(), s["sum"]) for s in statistics] == [
+        (h[0], 4.0),
+        (h[1], 5.0),
+        (h[2], 6.0),
+        (h[5], 8.0),
+    ]
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.resilience.RETRY_ATTEMPTS", 1)
+async def test_repair_refetch_failures(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    coordinator: AuroraPlusCoordinator = config_entry.runtime_data
+    today = dt_util.now().date()
+    first = today - datetime.timedelta(days=4)
+    await coordinator.usage_store.async_set_days({first: day(first)})
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    with (
+        patch(
+            "custom_components.auroraplus.importer."
+            "AuroraPlusStatisticsImporter.async_get_covered_hours",
+            side_effect=lambda statistic_ids, start: {},
+        ),
+        patch(
+            "custom_components.auroraplus.importer."
+            "AuroraPlusStatisticsImporter.async_import_since",
+            return_value=3,
+        ),
+    ):
+        # The check carries on without the days Aurora+ failed to return.
+        mock_api.getday.side_effect = aiohttp.ClientConnectionError("mock error")
+        await coordinator.repair.async_check()
+        assert coordinator.repair.result["refetched"] == 0
+        assert coordinator.repair.result["repaired"]
+
+        # Anything else is a bug, and isn't hidden.
+        mock_api.getday.side_effect = KeyError("StartDate")
+        with pytest.raises(KeyError):
+            await coordinator.repair.async_check()
@@ -0,0 +1,98 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+from auroraplus import AuroraPlusAuthenticationError
+
+from custom_components.auroraplus.resilience import (
+    ERROR_AUTH,
+    ERROR_PERMANENT,
+    ERROR_THROTTLED,
+    ERROR_TRANSIENT,
+    CircuitBreaker,
+    CircuitOpenError,
+    async_call_with_retry,
+    classify_error,
+    retry_after,
+)
+
+
+def response_error(status: int, headers: dict | None = None):
+    return aiohttp.ClientResponseError(MagicMock(), (), status=status, headers=headers)
+
+
+def test_classify_error():
+    assert classify_error(AuroraPlusAuthenticationError()) == ERROR_AUTH
+    assert classify_error(response_error(401)) == ERROR_AUTH
+    assert classify_error(response_error(429)) == ERROR_THROTTLED
+    assert classify_error(response_error(503)) == ERROR_TRANSIENT
+    assert classify_error(aiohttp.ClientConnectionError()) == ERROR_TRANSIENT
+    assert classify_error(TimeoutError()) == ERROR_TRANSIENT
+    assert classify_error(response_error(404)) == ERROR_PERMANENT
+    assert classify_error(KeyError("Premises")) == ERROR_PERMANENT
+
+
+def test_retry_after():
+    assert retry_after(response_error(429, {"Retry-After": "120"})) == 120.0
+    assert (
+        retry_after(
+            response_error(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        )
+        == 0.0
+    )
+    assert retry_after(response_error(429)) is None
+
+
+@patch("custom_components.auroraplus.resilience.asyncio.sleep", new_callable=AsyncMock)
+async def test_call_with_retry(sleep: AsyncMock):
+    breaker = CircuitBreaker("test")
+    call = AsyncMock(side_effect=[response_error(503), response_error(502), "ok"])
+
+    assert await async_call_with_retry(call, breaker) == "ok"
+    assert call.await_count == 3
+    assert sleep.await_count == 2
+
+    # Permanent errors aren't retried.
+    call = AsyncMock(side_effect=response_error(404))
+    with pytest.raises(aiohttp.ClientResponseError):
+        await async_call_with_retry(call, breaker)
+    assert call.await_count == 1
+
+    # Waits as long as asked to.
+    sleep.reset_mock()
+    call = AsyncMock(side_effect=[response_error(429, {"Retry-After": "7"}), "ok"])
+    assert await async_call_with_retry(call, breaker) == "ok"
+    sleep.assert_awaited_once_with(7.0)
+
+
+@patch("custom_components.auroraplus.resilience.asyncio.sleep", new_callable=AsyncMock)
+@patch("custom_components.auroraplus.resilience.time.monotonic")
+async def test_circuit_breaker(monotonic: MagicMock, sleep: AsyncMock):
+    monotonic.return_value = 1000.0
+    breaker = CircuitBreaker("test")
+    failing = AsyncMock(side_effect=response_error(503))
+
+    for _ in range(3):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await async_call_with_retry(failing, breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Open: no call goes out.
+    failing.reset_mock()
+    with pytest.raises(CircuitOpenError):
+        await async_call_with_retry(failing, breaker)
+    assert not failing.called
+
+    # Half-open: a single probe goes out, and a failure opens it again.
+    monotonic.return_value += 301
+    with pytest.raises(aiohttp.ClientResponseError):
+        await async_call_with_retry(failing, breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    monotonic.return_value += 301
+    with pytest.raises(CircuitOpenError):
+        await async_call_with_retry(failing, breaker)
+
+    # A successful probe closes it.
+    monotonic.return_value += 301
+    assert await async_call_with_retry(AsyncMock(return_value="ok"), breaker) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
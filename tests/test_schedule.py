@@ -0,0 +1,81 @@
+import datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.auroraplus.schedule import PublishTimeModel
+
+FIXED = datetime.timedelta(hours=1)
+
+
+async def test_publish_time_model(hass: HomeAssistant):
+    today = dt_util.start_of_local_day()
+    model = PublishTimeModel()
+
+    # Nothing learnt yet.
+    assert model.window() is None
+    assert model.next_update_interval(today, FIXED, None) == FIXED
+
+    for days_ago, hour in [(3, 9), (2, 10), (1, 11)]:
+        model.record(
+            today - datetime.timedelta(days=days_ago) + datetime.timedelta(hours=hour)
+        )
+    assert model.last_seen() == (
+        today - datetime.timedelta(days=1) + datetime.timedelta(hours=11)
+    )
+    assert model.window() == (
+        datetime.timedelta(hours=9),
+        datetime.timedelta(hours=11),
+    )
+
+    # Wait for the window, poll densely within it, then fall back if late.
+    early = today + datetime.timedelta(hours=7)
+    assert model.next_update_interval(early, FIXED, None) == datetime.timedelta(hours=2)
+    within = today + datetime.timedelta(hours=10)
+    assert model.next_update_interval(within, FIXED, None) == datetime.timedelta(
+        minutes=15
+    )
+    late = today + datetime.timedelta(hours=12)
+    assert model.next_update_interval(late, FIXED, None) == FIXED
+
+    # Once today's data is in, back off until tomorrow's window, in steps.
+    assert model.next_update_interval(within, FIXED, within) == datetime.timedelta(
+        hours=6
+    )
+
+
+async def test_publish_time_model_across_midnight(hass: HomeAssistant):
+    today = dt_util.start_of_local_day()
+    model = PublishTimeModel()
+    for days_ago, hour, minute in [(4, 23, 40), (2, 0, 10), (2, 23, 50), (0, 0, 20)]:
+        model.record(
+            today
+            - datetime.timedelta(days=days_ago)
+            + datetime.timedelta(hours=hour, minutes=minute)
+        )
+
+    # Around midnight, not midday.
+    assert model.window() == (
+        datetime.timedelta(hours=-1),
+        datetime.timedelta(hours=1),
+    )
+
+    evening = today + datetime.timedelta(hours=20)
+    assert model.next_update_interval(evening, FIXED, None) == datetime.timedelta(
+        hours=3
+    )
+    # The window is the same either side of midnight.
+    for within in (
+        today + datetime.timedelta(hours=23, minutes=30),
+        today + datetime.timedelta(days=1, minutes=30),
+    ):
+        assert model.next_update_interval(within, FIXED, None) == datetime.timedelta(
+            minutes=15
+        )
+    noon = today + datetime.timedelta(hours=11)
+    assert model.next_update_interval(noon, FIXED, None) == FIXED
+
+    # Data seen before midnight is the next day's.
+    seen = today + datetime.timedelta(hours=23, minutes=50)
+    after = today + datetime.timedelta(days=1, minutes=10)
+    assert model.next_update_interval(after, FIXED, seen) == datetime.timedelta(hours=6)
@@ -0,0 +1,192 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import MATCH_ALL, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from homeassistant_historical_sensor import HistoricalState
+
+from custom_components.auroraplus.const import (
+    CONF_COMPACT_ATTRIBUTES,
+    DOMAIN,
+    SENSOR_KILOWATTHOURUSAGETARIFF,
+)
+from custom_components.auroraplus.sensor import AuroraHistoricalSensor
+
+
+@pytest.fixture
+def historical_sensor(hass: HomeAssistant) -> AuroraHistoricalSensor:
+    coordinator = MagicMock()
+    coordinator.service_agreement_id = "mock_api_id"
+    return AuroraHistoricalSensor(
+        hass, f"{SENSOR_KILOWATTHOURUSAGETARIFF} T140", "AuroraPlus", coordinator, 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_calculate_statistic_data_incremental(
+    historical_sensor: AuroraHistoricalSensor,
+):
+    hour = 3600.0
+    start = 1765717200.0
+    states = [HistoricalState(state=1.0, timestamp=start + i * hour) for i in range(4)]
+
+    # Nothing imported yet.
+    statistics = await historical_sensor.async_calculate_statistic_data(states)
+    assert [s["sum"] for s in statistics] == [1.0, 2.0, 3.0, 4.0]
+
+    # The first two hours were already imported, the next one must still be.
+    statistics = await historical_sensor.async_calculate_statistic_data(
+        states, latest={"start": start + hour, "sum": 2.0}
+    )
+    assert [s["start"].timestamp() for s in statistics] == [
+        start + 2 * hour,
+        start + 3 * hour,
+    ]
+    assert [s["sum"] for s in statistics] == [3.0, 4.0]
+
+    # Everything already imported.
+    statistics = await historical_sensor.async_calculate_statistic_data(
+        states, latest={"start": start + 3 * hour, "sum": 4.0}
+    )
+    assert statistics == []
+
+
+@pytest.mark.asyncio
+async def test_balance_attributes_not_recorded(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    mock_api.EstimatedBalance = "12.30"
+    mock_api.AmountOwed = "1.00"
+    await config_entry.runtime_data.async_refresh()
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.auroraplus_mock_api_id_estimated_balance")
+    assert float(state.state) == 12.3
+    assert state.attributes["Amount Owed"] == 1.0
+    assert MATCH_ALL in state.state_info["unrecorded_attributes"]
+
+    # The details of the balance have their own sensors, disabled by default.
+    entry = er.async_get(hass).async_get("sensor.auroraplus_mock_api_id_amount_owed")
+    assert entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.AuroraPlusAsyncApi")
+async def test_compact_attributes(
+    mock_auroraplus_api: MagicMock,
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    # Set up again from the saved account, with the same API.
+    mock_auroraplus_api.from_account.return_value = mock_api
+    # Reloading needs the integration itself set up, not just the entry.
+    assert await async_setup_component(hass, DOMAIN, {})
+    hass.config_entries.async_update_entry(
+        config_entry, options={CONF_COMPACT_ATTRIBUTES: True}
+    )
+    await hass.config_entries.async_reload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.auroraplus_mock_api_id_kilowatt_hour_usage")
+    assert float(state.state) == 5.0
+    assert "T140" not in state.attributes
+
+
+@pytest.mark.asyncio
+async def test_new_tariff_adds_sensors(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    coordinator = config_entry.runtime_data
+    entity_registry = er.async_get(hass)
+    unique_id = "auroraplus_mock_api_id_kilowatt_hour_usage_tariff_t31"
+    assert not entity_registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+
+    def update_summary(index: int = -1):
+        mock_api.DollarValueUsage = {"T140": 1.5, "T31": 0.5, "Total": 2.0}
+        mock_api.KilowattHourUsage = {"T140": 5.0, "T31": 2.0, "Total": 7.0}
+
+    mock_api.getsummary.side_effect = update_summary
+    coordinator._last_day_date = dt_util.now().date() - datetime.timedelta(days=2)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.usage_store.tariffs == ["T140", "T31"]
+    assert entity_registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+
+
+@pytest.mark.asyncio
+@patch("custom_components.auroraplus.AuroraPlusAsyncApi")
+async def test_period_totals_from_store(
+    mock_auroraplus_api: MagicMock,
+    mock_api: MagicMock,
+    build_config_entry,
+    hass: HomeAssistant,
+    hass_storage: dict,
+):
+    mock_auroraplus_api.from_account.return_value = mock_api
+    yesterday = dt_util.now().date() - datetime.timedelta(days=1)
+    hass_storage["auroraplus.mock_api_id.usage"] = {
+        "version": 1,
+        "data": {
+            "account": {
+                "customerId": "mock_customer_id",
+                "serviceAgreementID": "mock_api_id",
+                "premiseAddress": "mock_address",
+                "TariffTypes": ["T140"],
+            },
+            "days": {
+                yesterday.isoformat(): {
+                    "records": [],
+                    "totals": {"KilowattHourUsage": {"T140": 3.0, "Total": 3.0}},
+                },
+            },
+        },
+    }
+
+    # Worked out from the saved days, before talking to Aurora+.
+    await build_config_entry(mock_api)
+    state = hass.states.get(
+        "sensor.auroraplus_mock_api_id_kilowatt_hour_usage_month_to_date"
+    )
+    assert float(state.state) == 3.0
+    assert state.attributes["T140"] == 3.0
+
+
+@pytest.mark.asyncio
+async def test_unavailable_when_update_fails(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    mock_api: MagicMock,
+):
+    entity_ids = [
+        "sensor.auroraplus_mock_api_id_estimated_balance",
+        "sensor.auroraplus_mock_api_id_kilowatt_hour_usage",
+        "sensor.auroraplus_mock_api_id_kilowatt_hour_usage_month_to_date",
+    ]
+    coordinator = config_entry.runtime_data
+    getcurrent = mock_api.getcurrent.side_effect
+    before = {entity_id: hass.states.get(entity_id).state for entity_id in entity_ids}
+
+    # The data is the same as before the failed update, but not current.
+    mock_api.getcurrent.side_effect = KeyError("Premises")
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    for entity_id in entity_ids:
+        assert hass.states.get(entity_id).state == STATE_UNAVAILABLE
+
+    # Back with the same values.
+    mock_api.getcurrent.side_effect = getcurrent
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    for entity_id in entity_ids:
+        assert hass.states.get(entity_id).state == before[entity_id]
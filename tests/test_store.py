@@ -0,0 +1,149 @@
+import datetime
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.auroraplus.const import STORAGE_SAVE_DELAY
+from custom_components.auroraplus.store import (
+    AuroraPlusUsageStore,
+    normalise_day,
+    split_days,
+    usage_columns,
+)
+
+DAY = {
+    "StartDate": "2025-12-14T13:00:00Z",
+    "NoDataFlag": False,
+    "MeteredUsageRecords": [
+        {
+            "StartTime": "2025-12-14T13:00:00Z",
+            "KilowattHourUsage": {"T93PEAK": 0.5, "T93OFFPEAK": None},
+            "DollarValueUsage": {},
+        },
+        None,
+        {
+            "StartTime": "2025-12-14T14:00:00Z",
+            "KilowattHourUsage": {"T93OFFPEAK": "0.25"},
+            "DollarValueUsage": {"T93OFFPEAK": 1.2},
+        },
+    ],
+    "SummaryTotals": {
+        "DollarValueUsage": {"T93OFFPEAK": 1.2, "Total": 1.2},
+        "KilowattHourUsage": {"T93PEAK": 0.5, "T93OFFPEAK": 0.25, "Total": 0.75},
+    },
+}
+
+
+def test_normalise_day():
+    day = normalise_day(DAY)
+
+    assert day["start_date"] == DAY["StartDate"]
+    assert day["records"] == [
+        [1765717200.0, {"KilowattHourUsage": {"T93PEAK": 0.5}}],
+        [
+            1765720800.0,
+            {
+                "DollarValueUsage": {"T93OFFPEAK": 1.2},
+                "KilowattHourUsage": {"T93OFFPEAK": 0.25},
+            },
+        ],
+    ]
+    assert day["totals"] == DAY["SummaryTotals"]
+
+
+def test_usage_columns():
+    columns = usage_columns(normalise_day(DAY))
+
+    assert columns == {
+        "KilowattHourUsage": {
+            "T93PEAK": ((1765717200.0,), (0.5,)),
+            "T93OFFPEAK": ((1765720800.0,), (0.25,)),
+        },
+        "DollarValueUsage": {
+            "T93OFFPEAK": ((1765720800.0,), (1.2,)),
+        },
+    }
+
+
+async def test_split_days(hass: HomeAssistant):
+    await hass.config.async_set_time_zone("Australia/Hobart")
+    week = {
+        "StartDate": "2025-12-13T13:00:00Z",
+        "MeteredUsageRecords": DAY["MeteredUsageRecords"]
+        + [
+            {
+                "StartTime": "2025-12-13T23:00:00Z",
+                "KilowattHourUsage": {"T93PEAK": 1.0},
+                "DollarValueUsage": {"T93PEAK": 0.3},
+            },
+            {"StartTime": "2025-12-15T01:00:00Z", "KilowattHourUsage": {}},
+        ],
+    }
+
+    days = split_days(week)
+
+    # Records are grouped by local date, and days without values are dropped.
+    assert list(days) == [datetime.date(2025, 12, 15), datetime.date(2025, 12, 14)]
+    assert (
+        days[datetime.date(2025, 12, 15)]["records"] == (normalise_day(DAY)["records"])
+    )
+    assert days[datetime.date(2025, 12, 15)]["totals"] == {
+        "KilowattHourUsage": {"Total": 0.75, "T93PEAK": 0.5, "T93OFFPEAK": 0.25},
+        "DollarValueUsage": {"Total": 1.2, "T93OFFPEAK": 1.2},
+    }
+    assert days[datetime.date(2025, 12, 14)]["totals"] == {
+        "KilowattHourUsage": {"Total": 1.0, "T93PEAK": 1.0},
+        "DollarValueUsage": {"Total": 0.3, "T93PEAK": 0.3},
+    }
+
+
+async def test_store_roundtrip(hass: HomeAssistant):
+    today = dt_util.now().date()
+    recent = today - datetime.timedelta(days=2)
+    old = today - datetime.timedelta(days=1000)
+
+    store = AuroraPlusUsageStore(hass, "mock_api_id")
+    await store.async_load()
+    await store.async_set_day(old, normalise_day(DAY))
+    await store.async_set_day(recent, normalise_day(DAY))
+
+    reloaded = AuroraPlusUsageStore(hass, "mock_api_id")
+    await reloaded.async_load()
+
+    assert recent in reloaded
+    assert old not in reloaded, "Days past the retention period were kept"
+    assert reloaded.latest_date() == recent
+    assert reloaded.get_day(recent) == normalise_day(DAY)
+    # Tariffs are found in the days added.
+    assert sorted(reloaded.tariffs) == ["T93OFFPEAK", "T93PEAK"]
+
+
+async def test_store_delays_small_changes(hass: HomeAssistant, hass_storage: dict):
+    key = "auroraplus.mock_api_id.usage"
+    today = dt_util.now().date()
+    store = AuroraPlusUsageStore(hass, "mock_api_id")
+    await store.async_load()
+    await store.async_set_day(today, normalise_day(DAY))
+    saved = hass_storage[key]["data"]
+
+    # Publish times don't rewrite the days straight away.
+    await store.async_set_publish_times([1765717200.0])
+    await hass.async_block_till_done()
+    assert hass_storage[key]["data"] is saved
+
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + datetime.timedelta(seconds=STORAGE_SAVE_DELAY)
+    )
+    await hass.async_block_till_done()
+    assert hass_storage[key]["data"]["publish_times"] == [1765717200.0]
+
+    # A new day saves whatever is pending along with it.
+    await store.async_set_publish_times([1765720800.0])
+    await store.async_set_day(today, normalise_day(DAY))
+    assert hass_storage[key]["data"]["publish_times"] == [1765720800.0]
+
+    # As does a flush, when the entry is unloaded.
+    await store.async_set_publish_times([1765724400.0])
+    await store.async_flush()
+    assert hass_storage[key]["data"]["publish_times"] == [1765724400.0]
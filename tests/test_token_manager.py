@@ -0,0 +1,87 @@
+import base64
+import datetime
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.auroraplus.const import TOKEN_RETRY_DELAY
+from custom_components.auroraplus.token_manager import (
+    AuroraPlusTokenManager,
+    token_expiry,
+)
+
+
+def jwt(expiry: datetime.datetime) -> str:
+    claims = json.dumps({"exp": int(expiry.timestamp())}).encode()
+    payload = base64.urlsafe_b64encode(claims).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def test_token_expiry():
+    expiry = dt_util.utcnow().replace(microsecond=0)
+    assert token_expiry(jwt(expiry)) == expiry
+    assert token_expiry("not a jwt") is None
+    assert token_expiry(None) is None
+
+
+async def test_token_refreshed_before_expiry(hass: HomeAssistant):
+    now = dt_util.utcnow()
+    api = MagicMock()
+    api.token = {"access_token": jwt(now + datetime.timedelta(hours=1))}
+
+    async def refresh_token(stale_access_token=None):
+        api.token = {"access_token": jwt(now + datetime.timedelta(hours=2))}
+
+    api.refresh_token = AsyncMock(side_effect=refresh_token)
+    on_rotated = AsyncMock()
+    manager = AuroraPlusTokenManager(hass, api, on_rotated)
+    manager.async_start()
+
+    # Not yet.
+    async_fire_time_changed(hass, now + datetime.timedelta(minutes=50))
+    await hass.async_block_till_done()
+    assert not api.refresh_token.called
+
+    # Five minutes before expiry.
+    async_fire_time_changed(hass, now + datetime.timedelta(minutes=56))
+    await hass.async_block_till_done()
+    api.refresh_token.assert_awaited_once()
+    on_rotated.assert_awaited_once()
+
+    manager.async_stop()
+
+
+async def test_token_refresh_failures(hass: HomeAssistant):
+    now = dt_util.utcnow()
+    api = MagicMock()
+    api.token = {"access_token": jwt(now + datetime.timedelta(hours=1))}
+    api.refresh_token = AsyncMock(
+        side_effect=aiohttp.ClientConnectionError("mock error")
+    )
+    manager = AuroraPlusTokenManager(hass, api, AsyncMock())
+    manager.async_start()
+
+    # Aurora+ failing is retried later.
+    async_fire_time_changed(hass, now + datetime.timedelta(minutes=56))
+    await hass.async_block_till_done()
+    assert api.refresh_token.await_count == 1
+    async_fire_time_changed(
+        hass,
+        now
+        + datetime.timedelta(minutes=56)
+        + datetime.timedelta(seconds=TOKEN_RETRY_DELAY + 1),
+    )
+    await hass.async_block_till_done()
+    assert api.refresh_token.await_count == 2
+
+    # Anything else is a bug, and isn't hidden.
+    api.refresh_token.side_effect = KeyError("accessToken")
+    with pytest.raises(KeyError):
+        await manager._async_refresh()
+
+    manager.async_stop()